@@ -1,226 +1,913 @@
 """
-Async Order Book implementation using hashmaps for O(1) operations.
+Async Order Book implementation using price-sorted hashmaps for fast top-of-book access.
 """
 import asyncio
+import concurrent.futures
 import logging
+import operator
 import threading
+import time
+from datetime import timedelta
 from decimal import Decimal
+from functools import partial
 from typing import List, Dict, Optional
 
+import orjson
 from asgiref.sync import sync_to_async
-from shared.models import Order, Trade
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from shared.models import Order, Trade, DEFAULT_SYMBOL
+from shared.utils import get_redis_client, order_book_cache
+
+from .skiplist import SkipList
 
 logger = logging.getLogger(__name__)
 
+# Prices are keyed by integer ticks inside the book; Decimal is only used at the edges
+TICK_SCALE = 10000
+TICKS_PER_CENT = TICK_SCALE // 100
 
-class OrderBook:
-    """High-performance async in-memory order book with O(1) operations."""
+# Upper bound on recycled BookOrder records kept for reuse
+BOOK_ORDER_POOL_SIZE = 100000
+
+# Statuses of orders that rest in the book
+RESTING_STATUSES = ('ACTIVE', 'PARTIALLY_FILLED')
+
+# Order columns the book reads or fills; also the warm-start snapshot layout
+BOOK_FIELDS = ('order_id', 'side', 'price_cents', 'quantity', 'created_at', 'user_id', *Order.FILL_UPDATE_FIELDS)
+
+# Trade batches waiting for notification; beyond this, batches are dropped
+FANOUT_QUEUE_SIZE = 10000
+
+# How far before a snapshot's save time warm starts re-read changed orders, in seconds
+SNAPSHOT_RECONCILE_MARGIN = 30.0
+
+# Longest a busy book goes without pushing its depth to WebSocket clients, in seconds
+BOOK_PUSH_INTERVAL = 1.0
+
+
+def to_ticks(price_cents: int) -> int:
+    """Convert a price in cents to integer ticks."""
+    return price_cents * TICKS_PER_CENT
+
+
+def from_ticks(ticks: int) -> Decimal:
+    """Convert integer ticks back to a Decimal price."""
+    return Decimal(ticks) / TICK_SCALE
+
+
+class BookOrder:
+    """Lightweight order record used by the matcher, linked into its price level's queue."""
+    
+    __slots__ = ('oid', 'price_ticks', 'side', 'remaining', 'ts', 'prev', 'next')
+    
+    def __init__(self, oid: str, price_ticks: int, side: int, remaining: int, ts: int):
+        self.oid = oid
+        self.price_ticks = price_ticks
+        self.side = side
+        self.remaining = remaining
+        self.ts = ts
+        self.prev: Optional['BookOrder'] = None
+        self.next: Optional['BookOrder'] = None
+
+
+class PriceLevel:
+    """FIFO queue of resting orders at one price, as an intrusive doubly-linked list."""
+    
+    __slots__ = ('head', 'tail', 'size')
     
     def __init__(self):
+        self.head: Optional[BookOrder] = None
+        self.tail: Optional[BookOrder] = None
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def append(self, node: BookOrder):
+        """Link node at the back of the queue."""
+        node.prev = self.tail
+        node.next = None
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+        self.size += 1
+    
+    def remove(self, node: BookOrder):
+        """Unlink node from anywhere in the queue in O(1)."""
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
+        self.size -= 1
+
+
+class OrderBook:
+    """
+    High-performance async in-memory order book with O(1) operations.
+    
+    All state mutations run on a single writer task that owns its own event
+    loop thread; public coroutines and submit() only enqueue work for it.
+    """
+    
+    def __init__(self, symbol: str = DEFAULT_SYMBOL):
         self.logger = logging.getLogger(__name__)
+        self.symbol = symbol
+        
+        # Single-writer machinery, started lazily on first submit
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inbox: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._fanout: Optional[asyncio.Queue] = None
+        self._fanout_task: Optional[asyncio.Task] = None
+        self._mirror_stale = False
+        self._last_book_push = 0.0
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._start_lock = threading.Lock()
         
-        # Thread safety for concurrent access
-        self._lock = threading.RLock()
+        # Database work runs on the book's own thread, so books for different
+        # symbols persist in parallel rather than queueing on one shared thread
+        self._db_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f'order-book-db-{symbol}'
+        )
         
-        # Price level hashmaps: price -> list of orders
-        self.bids: Dict[Decimal, List[Order]] = {}  # Buy orders
-        self.asks: Dict[Decimal, List[Order]] = {}  # Sell orders
+        # Resting orders and their lookups; (re)built by _reset_book
+        self._reset_book()
         
-        # Order lookup: order_id -> (price, side, order)
-        self.order_lookup: Dict[str, tuple] = {}
+        # Free list of BookOrder records released by fills and cancels
+        self._book_order_pool: List[BookOrder] = []
         
-        # Best bid/ask for O(1) top-of-book access
-        self.best_bid: Optional[Decimal] = None
-        self.best_ask: Optional[Decimal] = None
+        # Immutable top-of-book view: (best_bid_ticks, best_ask_ticks, bid levels, ask levels).
+        # Replaced wholesale by the writer so readers never need a lock.
+        self._tob_snapshot: tuple = (None, None, 0, 0)
         
-        # Price level tracking for efficient best price updates
-        self.bid_prices = set()
-        self.ask_prices = set()
+        # Bumped by every mutating writer operation; lets snapshots skip an idle book
+        self._version = 0
         
         # Performance metrics
         self.orders_processed = 0
         self.trades_created = 0
     
-    async def add_order(self, order: Order) -> List[Trade]:
-        """Add order to book and attempt matching. Returns list of trades."""
-        trades = []
+    def _reset_book(self):
+        """
+        Drop all resting orders so the next operation re-hydrates from the database.
+        
+        Used when a write fails after the book already changed in memory,
+        since the book would otherwise disagree with the database for good.
+        """
+        # Price-sorted levels: price ticks -> PriceLevel queue, best price at an end
+        self.bids = SkipList()  # Buy orders, best bid is the max key
+        self.asks = SkipList()  # Sell orders, best ask is the min key
+        
+        # Side-specialised matchers: buys cross asks at or below their price,
+        # sells cross bids at or above theirs
+        self._match_buy_order = partial(
+            self._match, levels=self.asks, peek_best=self.asks.peek_min, crosses=operator.ge
+        )
+        self._match_sell_order = partial(
+            self._match, levels=self.bids, peek_best=self.bids.peek_max, crosses=operator.le
+        )
+        
+        # Order lookup: order_id -> resting BookOrder
+        self.order_lookup: Dict[str, BookOrder] = {}
+        
+        # Django instances of resting orders; fills are written back to them
+        # only when a match is flushed
+        self.orders: Dict[str, Order] = {}
+        
+        # Set once the book has been hydrated from the database
+        self._bootstrapped = False
+        
+        # Orders loaded by bootstrap, until their own add/modify/cancel arrives.
+        # Their add may have been queued before bootstrap read them from the DB.
+        self._hydrated: Dict[str, Order] = {}
+    
+    @property
+    def best_bid_ticks(self) -> Optional[int]:
+        """Highest bid in ticks, or None when there are no bids."""
+        return self.bids.peek_max()[0] if self.bids else None
+    
+    @property
+    def best_ask_ticks(self) -> Optional[int]:
+        """Lowest ask in ticks, or None when there are no asks."""
+        return self.asks.peek_min()[0] if self.asks else None
+    
+    @property
+    def best_bid(self) -> Optional[Decimal]:
+        """Highest bid price, or None when there are no bids."""
+        return from_ticks(self.bids.peek_max()[0]) if self.bids else None
+    
+    @property
+    def best_ask(self) -> Optional[Decimal]:
+        """Lowest ask price, or None when there are no asks."""
+        return from_ticks(self.asks.peek_min()[0]) if self.asks else None
+    
+    def _ensure_started(self):
+        """Start the writer event loop thread once."""
+        if self._loop is not None:
+            return
+        
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+            thread = threading.Thread(
+                target=self._run_loop, args=(loop, started),
+                name=f'order-book-writer-{self.symbol}', daemon=True
+            )
+            thread.start()
+            started.wait()
+            self._loop = loop
+    
+    def _run_loop(self, loop: asyncio.AbstractEventLoop, started: threading.Event):
+        """Writer thread body. The writer task is created here so it runs in the
+        thread's own context rather than inheriting the first caller's."""
+        asyncio.set_event_loop(loop)
+        self._inbox = asyncio.Queue()
+        self._fanout = asyncio.Queue(maxsize=FANOUT_QUEUE_SIZE)
+        self._writer = loop.create_task(self._run())
+        self._fanout_task = loop.create_task(self._fanout_worker())
+        self._snapshot_task = loop.create_task(self._snapshot_worker())
+        started.set()
+        loop.run_forever()
+    
+    async def _run(self):
+        """Writer task: apply queued operations one at a time."""
+        handlers = {
+            'add': self._add_order,
+            'modify': self._modify_order,
+            'cancel': self._cancel_order,
+            'bootstrap': self._bootstrap,
+            'snapshot': self._take_snapshot,
+            'mirror': self._mirror_entries,
+        }
         
+        while True:
+            op, args, future = await self._inbox.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            read_only = op in ('snapshot', 'mirror')
+            if not read_only:
+                self._version += 1
+            
+            try:
+                result = await handlers[op](*args)
+            except Exception as e:
+                if not read_only:
+                    # The operation may have changed the book before failing to
+                    # persist; rebuild it from the database rather than diverge
+                    self.logger.error("Order book %s reset after failed %s: %s", self.symbol, op, e)
+                    self._reset_book()
+                self._publish_snapshot()
+                # The traceback holds this task's suspended frames; a caller
+                # clearing them (as assertRaises does) would close the writer
+                future.set_exception(e.with_traceback(None))
+            else:
+                self._publish_snapshot()
+                future.set_result(result)
+                continue
+            
+            # Outside the handler, so the reload never runs with the failure in flight
+            if not read_only and op != 'bootstrap':
+                await self._reload()
+    
+    async def _reload(self):
+        """
+        Re-bootstrap a reset book straight away, before any queued operation.
+        
+        The replay matches the order whose persist failed, so the book is
+        not left crossed. If the database is still failing, the book stays
+        empty and the next operation bootstraps it.
+        """
         try:
-            with self._lock:
-                self.logger.info(f"Processing order {order.order_id}: side={order.side}, price={order.price}, qty={order.remaining_quantity}")
-                self.logger.info(f"Current order book state - Best bid: {self.best_bid}, Best ask: {self.best_ask}")
-                
-                # First, check for existing orders in database that could match
-                await self._load_matching_orders(order)
-                
-                if order.side == 1:  # Buy order
-                    trades = await self._match_buy_order(order)
-                    if order.remaining_quantity > 0:
-                        self._add_buy_order(order)
-                        self.logger.info(f"Added buy order {order.order_id} to book at price {order.price}")
-                else:  # Sell order  
-                    trades = await self._match_sell_order(order)
-                    if order.remaining_quantity > 0:
-                        self._add_sell_order(order)
-                        self.logger.info(f"Added sell order {order.order_id} to book at price {order.price}")
-                
-                # Update metrics
-                self.orders_processed += 1
-                self.trades_created += len(trades)
-                
-                self.logger.info(f"Order {order.order_id} processed, created {len(trades)} trades")
-                self.logger.info(f"Updated order book state - Best bid: {self.best_bid}, Best ask: {self.best_ask}")
-                return trades
-                
+            await self._bootstrap()
         except Exception as e:
-            self.logger.error(f"Error processing order {order.order_id}: {e}")
-            return trades
+            self.logger.error("Order book %s reload failed: %s", self.symbol, e)
+            self._reset_book()
+        self._publish_snapshot()
     
-    async def _load_matching_orders(self, new_order: Order):
-        """Load existing orders from database that could potentially match with the new order."""
-        try:
-            if new_order.side == 1:  # Buy order - look for sell orders at or below this price
-                existing_orders = await sync_to_async(list)(
-                    Order.objects.filter(
-                        side=-1,  # Sell orders
-                        is_active=True,
-                        status__in=['ACTIVE', 'PARTIALLY_FILLED'],
-                        price__lte=new_order.price
-                    ).exclude(order_id=new_order.order_id).order_by('price', 'created_at')
-                )
-            else:  # Sell order - look for buy orders at or above this price
-                existing_orders = await sync_to_async(list)(
-                    Order.objects.filter(
-                        side=1,  # Buy orders
-                        is_active=True,
-                        status__in=['ACTIVE', 'PARTIALLY_FILLED'],
-                        price__gte=new_order.price
-                    ).exclude(order_id=new_order.order_id).order_by('-price', 'created_at')
-                )
+    async def _fanout_worker(self):
+        """Publish persisted trades and mirror book changes, off the matching path and in order."""
+        covered = 0
+        while True:
+            trades, upserts, removes, reset, depth = await self._fanout.get()
+            if covered:
+                # Queued before the last rebuild, which already holds these changes
+                covered -= 1
+                upserts, removes, reset = [], [], False
             
-            self.logger.info(f"Found {len(existing_orders)} existing orders that could match with {new_order.order_id}")
+            try:
+                # Network I/O runs on a worker thread so it never stalls the writer
+                trade_entries = await sync_to_async(self._publish, thread_sensitive=False)(
+                    trades, upserts, removes, reset
+                )
+                if self._mirror_stale:
+                    covered = await self._rebuild_mirror()
+            except Exception as e:
+                # The mirror may now be behind; rebuild it once Redis answers again
+                self._mirror_stale = True
+                self.logger.error("Error publishing %s trades for %s: %s", len(trades), self.symbol, e)
+                continue
             
-            # Add these orders to the order book if they're not already there
-            for order in existing_orders:
-                order_key = str(order.order_id)
-                if order_key not in self.order_lookup:
-                    if order.side == 1:  # Buy order
-                        self._add_buy_order(order)
-                    else:  # Sell order
-                        self._add_sell_order(order)
-                    self.logger.info(f"Loaded existing order {order.order_id} into book")
-                    
-        except Exception as e:
-            self.logger.error(f"Error loading matching orders: {e}")
+            try:
+                await self._push_updates(trade_entries, depth)
+            except Exception as e:
+                self.logger.error("Error pushing updates for %s to WebSocket groups: %s", self.symbol, e)
     
-    def _add_buy_order(self, order: Order):
-        """Add buy order to bids."""
-        price = order.price
+    async def _rebuild_mirror(self) -> int:
+        """
+        Replace the Redis mirror with the whole book after it fell behind.
+        
+        Returns how many queued batches predate the rebuild; their mirror
+        changes are already part of it.
+        """
+        upserts, covered = await asyncio.wrap_future(self.submit('mirror'))
+        await sync_to_async(self._publish, thread_sensitive=False)([], upserts, [], True)
+        self.logger.info("Order book %s mirror rebuilt with %s orders", self.symbol, len(upserts))
+        return covered
+    
+    async def _mirror_entries(self):
+        """Writer-side: every resting order as a mirror entry, with the number of batches queued before it."""
+        # Anything dropped from here on is missing from these entries and
+        # marks the mirror stale again
+        self._mirror_stale = False
+        upserts = [order_book_cache.order_entry(self.orders[oid]) for oid in self.order_lookup]
+        return upserts, self._fanout.qsize()
+    
+    def _publish(self, trades: List[Trade], upserts: List[dict], removes: List[tuple], reset: bool) -> List[dict]:
+        """
+        Update the Redis book mirror and send trades to the trade notification channel.
         
-        if price not in self.bids:
-            self.bids[price] = []
-            self.bid_prices.add(price)
+        Everything accumulated since the last drain goes out in one
+        round-trip, with the trades in a single message.
+        """
+        trade_entries = [trade.to_dict() for trade in trades]
+        if not (upserts or removes or reset or trade_entries):
+            return trade_entries
         
-        self.bids[price].append(order)
-        self.order_lookup[str(order.order_id)] = (price, 1, order)
+        pipe = get_redis_client().pipeline()
+        if upserts or removes or reset:
+            order_book_cache.queue_book_changes(pipe, self.symbol, upserts, removes, reset)
         
-        if self.best_bid is None or price > self.best_bid:
-            self.best_bid = price
+        if trade_entries:
+            pipe.publish(settings.REDIS_CHANNELS['trade_notifications'], orjson.dumps({
+                'type': 'trades',
+                'symbol': self.symbol,
+                'trades': trade_entries,
+            }))
+        pipe.execute()
+        return trade_entries
     
-    def _add_sell_order(self, order: Order):
-        """Add sell order to asks."""
-        price = order.price
+    async def _push_updates(self, trade_entries: List[dict], depth: Optional[dict]):
+        """
+        Push new trades and the batch's book depth to WebSocket consumer groups.
+        
+        Depth is captured by the writer once the batch is persisted, so it
+        never shows a match still being written; during a burst it is pushed
+        once the queue drains, or at least every BOOK_PUSH_INTERVAL seconds.
+        """
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        
+        # Frames are serialized once here and sent as-is by every consumer
+        if trade_entries:
+            await channel_layer.group_send(settings.CHANNEL_GROUPS['trades'], {
+                'type': 'trades.update',
+                'text': orjson.dumps({'trades': trade_entries}).decode(),
+            })
         
-        if price not in self.asks:
-            self.asks[price] = []
-            self.ask_prices.add(price)
+        now = time.monotonic()
+        if depth is not None and (self._fanout.empty() or now - self._last_book_push >= BOOK_PUSH_INTERVAL):
+            self._last_book_push = now
+            await channel_layer.group_send(order_book_cache.update_group(self.symbol), {
+                'type': 'book.update',
+                'text': orjson.dumps(depth).decode(),
+            })
+    
+    def depth_view(self, depth: int) -> dict:
+        """Top depth resting orders per side as price/quantity entries. Writer loop only."""
+        return {
+            'bids': self._side_view(self.bids.reversed_items(), depth),
+            'asks': self._side_view(self.asks.items(), depth),
+        }
+    
+    @staticmethod
+    def _side_view(levels, depth: int) -> List[dict]:
+        """Walk levels best-first in time priority, taking up to depth orders."""
+        entries = []
+        for ticks, level in levels:
+            price = ticks / TICK_SCALE  # float straight from ticks, no Decimal round-trip
+            node = level.head
+            while node is not None:
+                entries.append({'price': price, 'quantity': node.remaining})
+                if len(entries) == depth:
+                    return entries
+                node = node.next
+        return entries
+    
+    def _notify(self, trades: List[Trade], changed_orders: Dict[str, Order], reset: bool = False):
+        """
+        Hand persisted trades and changed orders to the fanout worker without waiting on it.
         
-        self.asks[price].append(order)
-        self.order_lookup[str(order.order_id)] = (price, -1, order)
+        Changed orders still in the book are mirrored with their current
+        state; the rest are removed from the mirror. A dropped batch only
+        marks the mirror stale; the fanout worker rebuilds it. The depth
+        pushed to WebSocket clients is captured here, with the book as
+        persisted, rather than read later while another match is in flight.
+        """
+        upserts, removes = [], []
+        for oid, order in changed_orders.items():
+            if oid in self.order_lookup:
+                upserts.append(order_book_cache.order_entry(order))
+            else:
+                removes.append((oid, order.side))
+        depth = self.depth_view(settings.ORDER_BOOK_DEPTH) if upserts or removes or reset else None
         
-        if self.best_ask is None or price < self.best_ask:
-            self.best_ask = price
+        try:
+            self._fanout.put_nowait((trades, upserts, removes, reset, depth))
+        except asyncio.QueueFull:
+            self._mirror_stale = True
+            self.logger.warning("Fanout queue full for %s, dropping %s trade notifications", self.symbol, len(trades))
+    
+    def _publish_snapshot(self):
+        """Swap in a fresh top-of-book snapshot. Writer task only."""
+        self._tob_snapshot = (self.best_bid_ticks, self.best_ask_ticks, len(self.bids), len(self.asks))
+    
+    @property
+    def tob_snapshot(self) -> tuple:
+        """Latest (best_bid_ticks, best_ask_ticks, bid levels, ask levels); lock-free read."""
+        return self._tob_snapshot
+    
+    def submit(self, op: str, *args) -> concurrent.futures.Future:
+        """Queue an operation for the writer task. Safe to call from any thread."""
+        self._ensure_started()
+        future = concurrent.futures.Future()
+        self._loop.call_soon_threadsafe(self._inbox.put_nowait, (op, args, future))
+        return future
+    
+    async def add_order(self, order: Order) -> List[Trade]:
+        """Add order to book and attempt matching. Returns list of trades."""
+        return await asyncio.wrap_future(self.submit('add', order))
+    
+    async def modify_order(self, order: Order) -> List[Trade]:
+        """Re-price a resting order. The order loses its time priority."""
+        return await asyncio.wrap_future(self.submit('modify', order))
+    
+    async def cancel_order(self, order_id: str) -> bool:
+        """Cancel an order. Returns True if successful."""
+        return await asyncio.wrap_future(self.submit('cancel', order_id))
+    
+    async def bootstrap(self):
+        """Hydrate the book from resting orders in the database, if not done yet."""
+        return await asyncio.wrap_future(self.submit('bootstrap'))
     
-    async def _match_buy_order(self, buy_order: Order) -> List[Trade]:
-        """Match buy order against asks."""
+    async def _modify_order(self, order: Order) -> List[Trade]:
+        """Writer-side modify: re-price the order and re-match it."""
+        return await self._add_order(order, is_modify=True)
+    
+    async def _add_order(self, order: Order, is_modify: bool = False) -> List[Trade]:
+        """Writer-side add: match the order, rest any remainder and persist fills."""
         trades = []
+        touched_orders = {}
+        oid = str(order.order_id)
         
-        while buy_order.remaining_quantity > 0 and self.best_ask and buy_order.price >= self.best_ask:
-            ask_orders = self.asks.get(self.best_ask, [])
-            
-            if not ask_orders:
-                self._update_best_ask()
-                continue
+        try:
+            self.logger.debug("Processing order %s: side=%s, price=%s, qty=%s",
+                              order.order_id, order.side, order.price, order.remaining_quantity)
             
-            sell_order = ask_orders[0]
-            trade_quantity = min(buy_order.remaining_quantity, sell_order.remaining_quantity)
+            # Hydrate from the database on first use, then continue from the
+            # book's own copy of this order if it already has one
+            await self._bootstrap()
+            if not is_modify and self._rests_from_bootstrap(oid):
+                return trades
+            order = await self._claim_order(order, oid, is_modify)
+            if order is None:
+                return trades
             
-            # Create trade async
-            trade = await sync_to_async(Trade.objects.create)(
-                price=self.best_ask,
-                quantity=trade_quantity,
-                bid_order=buy_order,
-                ask_order=sell_order
-            )
-            trades.append(trade)
+            trades = self._match_and_rest(order, oid, touched_orders)
             
-            self.logger.info(f"Created trade: {trade_quantity} @ {self.best_ask} between {buy_order.order_id} and {sell_order.order_id}")
+            # Persist all fills from this match in one round-trip per table
+            if trades:
+                await self._persist_matches(trades, list(touched_orders.values()))
             
-            # Update orders using the proper update_trade method (async)
-            await sync_to_async(buy_order.update_trade)(trade_quantity, self.best_ask)
-            await sync_to_async(sell_order.update_trade)(trade_quantity, self.best_ask)
+            # Update metrics
+            self.orders_processed += 1
+            self.trades_created += len(trades)
             
-            # Remove filled sell order
-            if sell_order.remaining_quantity == 0:
-                ask_orders.pop(0)
-                del self.order_lookup[str(sell_order.order_id)]
-                
-                if not ask_orders:
-                    del self.asks[self.best_ask]
-                    self.ask_prices.discard(self.best_ask)
-                    self._update_best_ask()
+            touched_orders[oid] = order
+            self._notify(trades, touched_orders)
             
-        return trades
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Order %s processed, created %s trades - Best bid: %s, Best ask: %s",
+                                  oid, len(trades), self.best_bid, self.best_ask)
+            return trades
+        
+        except Exception as e:
+            # Raised so the caller's future fails instead of reporting unpersisted trades
+            self.logger.error("Error processing order %s: %s", oid, e)
+            raise
     
-    async def _match_sell_order(self, sell_order: Order) -> List[Trade]:
-        """Match sell order against bids."""
+    def _match_and_rest(self, order: Order, oid: str, touched_orders: Dict[str, Order]) -> List[Trade]:
+        """Match an order against the book and rest any remainder. Returns its unpersisted trades."""
         trades = []
+        book_order = self._book_order(order, oid)
+        if book_order.side == 1:  # Buy order
+            fills = self._match_buy_order(book_order)
+        else:  # Sell order
+            fills = self._match_sell_order(book_order)
         
-        while sell_order.remaining_quantity > 0 and self.best_bid and sell_order.price <= self.best_bid:
-            bid_orders = self.bids.get(self.best_bid, [])
-            
-            if not bid_orders:
-                self._update_best_bid()
-                continue
-            
-            buy_order = bid_orders[0]
-            trade_quantity = min(sell_order.remaining_quantity, buy_order.remaining_quantity)
-            
-            # Create trade async
-            trade = await sync_to_async(Trade.objects.create)(
-                price=self.best_bid,
-                quantity=trade_quantity,
-                bid_order=buy_order,
-                ask_order=sell_order
+        if fills:
+            trades = self._apply_fills(order, oid, fills, touched_orders)
+        
+        if book_order.remaining > 0:
+            if book_order.side == 1:
+                self._add_buy_order(order, book_order)
+            else:
+                self._add_sell_order(order, book_order)
+        else:
+            self._release_book_order(book_order)
+        return trades
+    
+    async def _db(self, func, *args):
+        """Run blocking ORM work on this book's database thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._db_executor, partial(self._run_db_work, func, *args)
+        )
+    
+    @staticmethod
+    def _run_db_work(func, *args):
+        """
+        Database thread body for one unit of work.
+        
+        The thread keeps its connection between units; after a failure it is
+        closed, as it may be broken, and the next unit reconnects.
+        """
+        try:
+            return func(*args)
+        except Exception:
+            connections.close_all()
+            raise
+    
+    @staticmethod
+    def _fetch_orders(queryset) -> List[Order]:
+        """Evaluate an order queryset in chunks."""
+        return list(queryset.iterator(chunk_size=500))
+    
+    async def _persist_matches(self, trades: List[Trade], orders: List[Order]):
+        """Write the trades and order fills produced by a single match."""
+        await self._db(self._write_matches, trades, orders)
+    
+    @staticmethod
+    def _write_matches(trades: List[Trade], orders: List[Order]):
+        """Lock the touched order rows, then write trades and fills in one transaction."""
+        with transaction.atomic():
+            # Row locks (in pk order to avoid deadlocks) keep other writers from
+            # filling the same orders concurrently; the book stays authoritative
+            list(
+                Order.objects.select_for_update()
+                .filter(pk__in=[order.pk for order in orders])
+                .order_by('pk')
+                .values_list('pk', flat=True)
             )
-            trades.append(trade)
+            Trade.objects.bulk_create(trades)
+            Order.objects.bulk_update(orders, Order.FILL_UPDATE_FIELDS)
+    
+    async def _claim_order(self, order: Order, oid: str, is_modify: bool) -> Optional[Order]:
+        """
+        Take the order out of the book before (re-)adding it.
+        
+        The incoming instance may be stale: it was read by the caller before
+        bootstrap loaded the order, or before a fill was applied. The book's
+        copy carries the latest fill state, so it is re-priced and used
+        instead. Returns None when the order is no longer live.
+        """
+        hydrated = self._hydrated.pop(oid, None)
+        current = self._remove_order(oid) or hydrated
+        
+        if current is None:
+            if is_modify:
+                # Not resting, so it may have filled since the caller read it
+                await self._db(partial(order.refresh_from_db, fields=Order.FILL_UPDATE_FIELDS))
+            return order if order.is_active else None
+        
+        if not current.is_active:
+            return None
+        
+        current.price_cents = order.price_cents
+        return current
+    
+    def _rests_from_bootstrap(self, oid: str) -> bool:
+        """
+        True when bootstrap already rested this order, so its add has nothing left to do.
+        
+        Bootstrap matched it against the orders before it, so it cannot cross
+        the book; re-adding it would only move it behind orders created after
+        it at the same price.
+        """
+        if oid not in self._hydrated or oid not in self.order_lookup:
+            return False
+        
+        del self._hydrated[oid]
+        return True
+    
+    async def _bootstrap(self):
+        """Writer-side bootstrap: load resting orders on first use."""
+        if self._bootstrapped:
+            return
+        
+        # Warm start from the Redis snapshot when there is one; the database
+        # stays the source of truth and is only asked for what changed since
+        snapshot = await self._load_snapshot()
+        if snapshot is not None and await self._warm_start(*snapshot):
+            return
+        
+        resting_orders = self._resting_queryset(
+            is_active=True,
+            status__in=RESTING_STATUSES
+        )
+        
+        # Replayed in arrival order, so orders that crossed while no book was
+        # running trade now, at the earlier order's price
+        loaded = 0
+        trades, touched_orders = [], {}
+        for order in await self._db(self._fetch_orders, resting_orders):
+            loaded += 1
+            order_key = str(order.order_id)
+            if order_key in self.order_lookup:
+                continue
+            self._hydrated[order_key] = order
+            trades += self._match_and_rest(order, order_key, touched_orders)
+        
+        if trades:
+            await self._persist_matches(trades, list(touched_orders.values()))
+            self.trades_created += len(trades)
+        
+        self._bootstrapped = True
+        self._notify(trades, self.orders, reset=True)
+        self.logger.info("Order book %s bootstrapped with %s resting orders, %s trades on replay",
+                         self.symbol, loaded, len(trades))
+    
+    async def _warm_start(self, snapshot_orders: List[Order], saved_at) -> bool:
+        """
+        Hydrate from a snapshot and reconcile it with the database.
+        
+        Returns False, leaving the book empty, when the reconciled book
+        crosses so the caller falls back to a full load.
+        """
+        for order in snapshot_orders:
+            self._hydrate(order, str(order.order_id))
+        
+        # Order rows are written before their add reaches the writer, so an
+        # order can predate the snapshot without being in it; the margin
+        # covers that gap, and the (symbol, updated_at) index keeps this a
+        # range read rather than a scan of the symbol's history
+        since = saved_at - timedelta(seconds=SNAPSHOT_RECONCILE_MARGIN)
+        changed = 0
+        for order in await self._db(self._fetch_orders, self._resting_queryset(updated_at__gte=since)):
+            changed += 1
+            self._reconcile(order, str(order.order_id))
+        
+        # Orders that changed since may now cross; only a full load replays
+        # them in arrival order
+        if self.bids and self.asks and self.best_bid_ticks >= self.best_ask_ticks:
+            self.logger.warning("Order book %s snapshot crosses after reconciling, loading from database",
+                                self.symbol)
+            self._reset_book()
+            return False
+        
+        self._bootstrapped = True
+        self._notify([], self.orders, reset=True)
+        self.logger.info("Order book %s bootstrapped from snapshot with %s orders, %s changed since",
+                         self.symbol, len(snapshot_orders), changed)
+        return True
+    
+    def _resting_queryset(self, **filters):
+        """This symbol's orders, streaming only the columns the book reads or fills."""
+        return Order.objects.filter(symbol=self.symbol, **filters).only(*BOOK_FIELDS).order_by('created_at')
+    
+    def _hydrate(self, order: Order, oid: str):
+        """Rest an order loaded from storage rather than submitted by a caller."""
+        self._hydrated[oid] = order
+        book_order = self._book_order(order, oid)
+        if order.side == 1:  # Buy order
+            self._add_buy_order(order, book_order)
+        else:  # Sell order
+            self._add_sell_order(order, book_order)
+    
+    def _reconcile(self, order: Order, oid: str):
+        """Bring a snapshot-loaded book in line with an order changed since the snapshot."""
+        book_order = self.order_lookup.get(oid)
+        is_resting = order.is_active and order.status in RESTING_STATUSES
+        
+        # Still resting at the same price: refresh fill state and keep its priority
+        if book_order is not None and is_resting and book_order.price_ticks == to_ticks(order.price_cents):
+            current = self.orders[oid]
+            for name in Order.FILL_UPDATE_FIELDS:
+                setattr(current, name, getattr(order, name))
+            book_order.remaining = order.remaining_quantity
+            return
+        
+        self._hydrated.pop(oid, None)
+        self._remove_order(oid)
+        if is_resting:
+            self._hydrate(order, oid)
+    
+    @property
+    def snapshot_key(self) -> str:
+        """Redis key holding this book's warm-start snapshot."""
+        return f'ob:snapshot:{self.symbol}'
+    
+    async def _take_snapshot(self, requested_at=None):
+        """
+        Writer-side snapshot: resting orders in price-level FIFO order, as plain values.
+        
+        Saved as of when it was requested rather than taken: an order row
+        written before then has its add queued ahead of the snapshot, so a
+        backed-up inbox cannot push it out of the warm-start reconcile window.
+        """
+        rows = []
+        for levels in (self.bids, self.asks):
+            for _, level in levels.items():
+                node = level.head
+                while node is not None:
+                    order = self.orders[node.oid]
+                    rows.append([getattr(order, name) for name in BOOK_FIELDS])
+                    node = node.next
+        
+        return self._version, {
+            'symbol': self.symbol,
+            'saved_at': requested_at or timezone.now(),
+            'fields': BOOK_FIELDS,
+            'orders': rows,
+        }
+    
+    async def _snapshot_worker(self):
+        """Store a snapshot of the book in Redis every few seconds while it is changing."""
+        interval = getattr(settings, 'ORDER_BOOK_SNAPSHOT_INTERVAL', 5)
+        saved_version = None
+        
+        while True:
+            await asyncio.sleep(interval)
+            if not self._bootstrapped or self._version == saved_version:
+                continue
             
-            self.logger.info(f"Created trade: {trade_quantity} @ {self.best_bid} between {buy_order.order_id} and {sell_order.order_id}")
+            try:
+                # Taken between writer operations so it never sees a half-persisted match
+                version, payload = await asyncio.wrap_future(self.submit('snapshot', timezone.now()))
+                await sync_to_async(self._store_snapshot, thread_sensitive=False)(payload)
+                saved_version = version
+            except Exception as e:
+                self.logger.error("Error saving order book snapshot for %s: %s", self.symbol, e)
+    
+    def _store_snapshot(self, payload: dict):
+        """Write a snapshot payload to Redis."""
+        get_redis_client().set(
+            self.snapshot_key,
+            orjson.dumps(payload, default=str),
+            ex=getattr(settings, 'ORDER_BOOK_SNAPSHOT_TTL', 3600)
+        )
+    
+    def _fetch_snapshot(self) -> Optional[dict]:
+        """Read this book's snapshot payload from Redis, if there is one."""
+        raw = get_redis_client().get(self.snapshot_key)
+        return orjson.loads(raw) if raw else None
+    
+    async def _load_snapshot(self):
+        """Rebuild snapshot orders as Django instances. Returns (orders, saved_at), or None."""
+        try:
+            payload = await sync_to_async(self._fetch_snapshot, thread_sensitive=False)()
+            if payload is None or tuple(payload['fields']) != BOOK_FIELDS:
+                return None
             
-            # Update orders using the proper update_trade method (async)
-            await sync_to_async(sell_order.update_trade)(trade_quantity, self.best_bid)
-            await sync_to_async(buy_order.update_trade)(trade_quantity, self.best_bid)
+            # from_db expects values in model field order
+            fields = [Order._meta.get_field(name) for name in BOOK_FIELDS]
+            loaded_names = [field.attname for field in Order._meta.concrete_fields if field.attname in BOOK_FIELDS]
+            orders = []
+            for row in payload['orders']:
+                values = {field.attname: field.to_python(value) for field, value in zip(fields, row)}
+                orders.append(Order.from_db('default', loaded_names, [values[name] for name in loaded_names]))
+            return orders, parse_datetime(payload['saved_at'])
+        except Exception as e:
+            self.logger.warning("Order book snapshot for %s unavailable, loading from database: %s", self.symbol, e)
+            return None
+    
+    def _book_order(self, order: Order, oid: str) -> BookOrder:
+        """Build the matcher's record for a Django order, reusing a pooled one if available."""
+        if not self._book_order_pool:
+            return BookOrder(oid, to_ticks(order.price_cents), order.side, order.remaining_quantity, time.monotonic_ns())
+        
+        book_order = self._book_order_pool.pop()
+        book_order.oid = oid
+        book_order.price_ticks = to_ticks(order.price_cents)
+        book_order.side = order.side
+        book_order.remaining = order.remaining_quantity
+        book_order.ts = time.monotonic_ns()
+        return book_order
+    
+    def _release_book_order(self, book_order: BookOrder):
+        """Return an unlinked record to the pool, up to its cap."""
+        if len(self._book_order_pool) < BOOK_ORDER_POOL_SIZE:
+            book_order.prev = book_order.next = None
+            self._book_order_pool.append(book_order)
+    
+    def _add_buy_order(self, order: Order, book_order: BookOrder):
+        """Add buy order to bids."""
+        level = self.bids.get(book_order.price_ticks)
+        if level is None:
+            level = self.bids.setdefault(book_order.price_ticks, PriceLevel())
+        level.append(book_order)
+        self.order_lookup[book_order.oid] = book_order
+        self.orders[book_order.oid] = order
+    
+    def _add_sell_order(self, order: Order, book_order: BookOrder):
+        """Add sell order to asks."""
+        level = self.asks.get(book_order.price_ticks)
+        if level is None:
+            level = self.asks.setdefault(book_order.price_ticks, PriceLevel())
+        level.append(book_order)
+        self.order_lookup[book_order.oid] = book_order
+        self.orders[book_order.oid] = order
+    
+    def _match(self, taker: BookOrder, levels: SkipList, peek_best, crosses) -> List[tuple]:
+        """
+        Match a taker against the opposite side. Returns (resting order, its id, quantity) fills.
+        
+        levels, peek_best and crosses are bound per side in __init__, so the
+        loop itself never branches on side.
+        """
+        fills = []
+        taker_ticks = taker.price_ticks
+        remaining = taker.remaining
+        
+        # Bind hot attributes to locals for the loop below
+        order_lookup = self.order_lookup
+        orders = self.orders
+        add_fill = fills.append
+        release = self._release_book_order
+        
+        while remaining and levels:
+            best_price, level = peek_best()
+            if not crosses(taker_ticks, best_price):
+                break
             
-            # Remove filled buy order
-            if buy_order.remaining_quantity == 0:
-                bid_orders.pop(0)
-                del self.order_lookup[str(buy_order.order_id)]
+            # Drain this level before looking up the next best price
+            while remaining and level.head is not None:
+                maker = level.head
+                maker_remaining = maker.remaining
+                trade_quantity = remaining if remaining < maker_remaining else maker_remaining
+                remaining -= trade_quantity
+                maker.remaining = maker_remaining - trade_quantity
+                oid = maker.oid
+                add_fill((orders[oid], oid, trade_quantity))
                 
-                if not bid_orders:
-                    del self.bids[self.best_bid]
-                    self.bid_prices.discard(self.best_bid)
-                    self._update_best_bid()
+                # Remove filled resting order
+                if trade_quantity == maker_remaining:
+                    level.remove(maker)
+                    del order_lookup[oid]
+                    del orders[oid]
+                    release(maker)
+            
+            if level.head is None:
+                del levels[best_price]
+        
+        taker.remaining = remaining
+        return fills
+    
+    def _apply_fills(self, order: Order, oid: str, fills: List[tuple],
+                     touched_orders: Dict[str, Order]) -> List[Trade]:
+        """Write matcher fills back to the Django orders and build their trades."""
+        trades = []
+        is_buy = order.side == 1
+        
+        for resting_order, resting_oid, trade_quantity in fills:
+            # Trades execute at the resting order's price
+            trade_price_cents = resting_order.price_cents
+            trades.append(Trade(
+                price_cents=trade_price_cents,
+                quantity=trade_quantity,
+                bid_order=order if is_buy else resting_order,
+                ask_order=resting_order if is_buy else order
+            ))
             
+            order.apply_trade(trade_quantity, trade_price_cents)
+            resting_order.apply_trade(trade_quantity, trade_price_cents)
+            touched_orders[resting_oid] = resting_order
+        
+        touched_orders[oid] = order
         return trades
     
     def _update_order_status(self, order: Order):
@@ -232,48 +919,62 @@ class OrderBook:
             order.status = 'PARTIALLY_FILLED'
             order.is_active = True
     
-    def _update_best_bid(self):
-        """Update best bid price."""
-        self.best_bid = max(self.bid_prices) if self.bid_prices else None
+    def _remove_order(self, order_id: str) -> Optional[Order]:
+        """Unlink a resting order from the book. Returns the order if it was resting."""
+        book_order = self.order_lookup.pop(order_id, None)
+        if book_order is None:
+            return None
+        
+        levels = self.bids if book_order.side == 1 else self.asks
+        level = levels[book_order.price_ticks]
+        level.remove(book_order)
+        
+        if not level:
+            del levels[book_order.price_ticks]
+        
+        self._release_book_order(book_order)
+        return self.orders.pop(order_id)
     
-    def _update_best_ask(self):
-        """Update best ask price."""
-        self.best_ask = min(self.ask_prices) if self.ask_prices else None
+    async def _cancel_order(self, order_id: str) -> bool:
+        """Writer-side cancel: unlink the order and persist its cancelled state."""
+        await self._bootstrap()
+        self._hydrated.pop(order_id, None)
+        order = self._remove_order(order_id)
+        if order is None:
+            return False
+        
+        order.status = 'CANCELLED'
+        order.is_active = False
+        await self._db(order.save)
+        self._notify([], {order_id: order})
+        
+        return True
+
+
+class OrderBookRegistry:
+    """
+    Per-symbol order books, created on first use.
     
-    async def cancel_order(self, order_id: str) -> bool:
-        """Cancel an order. Returns True if successful."""
+    Each book owns its own writer thread, so symbols match independently.
+    """
+    
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, symbol: str = DEFAULT_SYMBOL) -> OrderBook:
+        """Return the book for symbol, creating it if needed."""
+        book = self.books.get(symbol)
+        if book is not None:
+            return book
+        
         with self._lock:
-            if order_id not in self.order_lookup:
-                return False
-                
-            price, side, order = self.order_lookup[order_id]
-            
-            if side == 1:  # Buy order
-                order_list = self.bids[price]
-                order_list.remove(order)
-                
-                if not order_list:
-                    del self.bids[price]
-                    self.bid_prices.discard(price)
-                    if price == self.best_bid:
-                        self._update_best_bid()
-            else:  # Sell order
-                order_list = self.asks[price]
-                order_list.remove(order)
-                
-                if not order_list:
-                    del self.asks[price]
-                    self.ask_prices.discard(price)
-                    if price == self.best_ask:
-                        self._update_best_ask()
-            
-            del self.order_lookup[order_id]
-            order.status = 'CANCELLED'
-            order.is_active = False
-            await sync_to_async(order.save)()
-            
-            return True
+            book = self.books.get(symbol)
+            if book is None:
+                book = OrderBook(symbol)
+                self.books[symbol] = book
+            return book
 
 
-# Global instance
-order_book = OrderBook()
+# Global registry
+registry = OrderBookRegistry()
@@ -20,3 +20,21 @@ ROOT_URLCONF = 'services.order_management.urls'
 
 # URL settings
 APPEND_SLASH = True
+
+# Logging - keep the matching engine quiet unless explicitly turned up
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'services.order_management.order_book': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
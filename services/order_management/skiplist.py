@@ -0,0 +1,144 @@
+"""
+Price-ordered skiplist for order book levels, keyed by integer ticks.
+"""
+import random
+from typing import Any, Iterator, Optional, Tuple
+
+MAX_LEVEL = 16
+PROMOTE_PROBABILITY = 0.25
+
+
+class SkipNode:
+    """Skiplist node holding one price level."""
+    
+    __slots__ = ('key', 'value', 'forward', 'prev')
+    
+    def __init__(self, key: Optional[int], value: Any, level: int):
+        self.key = key
+        self.value = value
+        self.forward: list = [None] * level
+        self.prev: Optional['SkipNode'] = None
+
+
+class SkipList:
+    """
+    Ordered int-keyed map with O(log n) insert/delete and O(1) min/max.
+    
+    A dict index gives O(1) lookups by key; the level-0 chain is doubly
+    linked so the maximum and descending walks are also cheap.
+    """
+    
+    def __init__(self):
+        self._head = SkipNode(None, None, MAX_LEVEL)
+        self._tail: Optional[SkipNode] = None
+        self._index = {}
+        self._level = 1
+        self._random = random.Random()
+    
+    def __len__(self):
+        return len(self._index)
+    
+    def __contains__(self, key: int) -> bool:
+        return key in self._index
+    
+    def __getitem__(self, key: int) -> Any:
+        return self._index[key].value
+    
+    def get(self, key: int, default: Any = None) -> Any:
+        """Return the value for key, or default when it is absent."""
+        node = self._index.get(key)
+        return default if node is None else node.value
+    
+    def _random_level(self) -> int:
+        """Pick a height for a new node."""
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < PROMOTE_PROBABILITY:
+            level += 1
+        return level
+    
+    def _find_update(self, key: int) -> list:
+        """Return the rightmost node before key on every level."""
+        update = [self._head] * MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            nxt = node.forward[i]
+            while nxt is not None and nxt.key < key:
+                node = nxt
+                nxt = node.forward[i]
+            update[i] = node
+        return update
+    
+    def setdefault(self, key: int, default: Any) -> Any:
+        """Return the value for key, inserting default if it is absent."""
+        node = self._index.get(key)
+        if node is not None:
+            return node.value
+        
+        update = self._find_update(key)
+        level = self._random_level()
+        if level > self._level:
+            self._level = level
+        
+        node = SkipNode(key, default, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+        
+        # Level 0 is doubly linked for the O(1) maximum
+        node.prev = update[0] if update[0] is not self._head else None
+        if node.forward[0] is None:
+            self._tail = node
+        else:
+            node.forward[0].prev = node
+        
+        self._index[key] = node
+        return default
+    
+    def __setitem__(self, key: int, value: Any):
+        node = self._index.get(key)
+        if node is None:
+            self.setdefault(key, value)
+        else:
+            node.value = value
+    
+    def __delitem__(self, key: int):
+        node = self._index.pop(key)
+        update = self._find_update(key)
+        for i in range(len(node.forward)):
+            update[i].forward[i] = node.forward[i]
+        
+        if node.forward[0] is None:
+            self._tail = node.prev
+        else:
+            node.forward[0].prev = node.prev
+        
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+    
+    def peek_min(self) -> Tuple[int, Any]:
+        """Return the (key, value) pair with the lowest key."""
+        node = self._head.forward[0]
+        if node is None:
+            raise IndexError('peek from empty skiplist')
+        return node.key, node.value
+    
+    def peek_max(self) -> Tuple[int, Any]:
+        """Return the (key, value) pair with the highest key."""
+        node = self._tail
+        if node is None:
+            raise IndexError('peek from empty skiplist')
+        return node.key, node.value
+    
+    def items(self) -> Iterator[Tuple[int, Any]]:
+        """Iterate (key, value) pairs in ascending key order."""
+        node = self._head.forward[0]
+        while node is not None:
+            yield node.key, node.value
+            node = node.forward[0]
+    
+    def reversed_items(self) -> Iterator[Tuple[int, Any]]:
+        """Iterate (key, value) pairs in descending key order."""
+        node = self._tail
+        while node is not None:
+            yield node.key, node.value
+            node = node.prev
@@ -0,0 +1,98 @@
+"""
+Order book tests for the order management service.
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TransactionTestCase
+
+from shared.models import Order, Trade
+from . import order_book
+from .order_book import OrderBook, to_ticks
+
+
+class OrderBookTestCase(TransactionTestCase):
+    """
+    Base case for tests driving a private OrderBook.
+    
+    The book persists from its own threads, so rows are committed rather
+    than wrapped in a test transaction. Redis and Channels are stubbed out.
+    """
+    
+    symbol = 'TEST'
+    
+    def setUp(self):
+        redis_client = mock.MagicMock()
+        redis_client.get.return_value = None
+        for name, value in (('get_redis_client', redis_client), ('get_channel_layer', None)):
+            patcher = mock.patch.object(order_book, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.book = OrderBook(self.symbol)
+    
+    def create_order(self, side: int, quantity: int, price: str) -> Order:
+        """Save a resting order the way the API does before queuing it."""
+        return Order.objects.create(
+            symbol=self.symbol, side=side, quantity=quantity, price=Decimal(price),
+            remaining_quantity=quantity, status='ACTIVE'
+        )
+    
+    def assertNotCrossed(self):
+        """Fail if the best bid reaches the best ask."""
+        best_bid_ticks, best_ask_ticks, _, _ = self.book.tob_snapshot
+        if best_bid_ticks is not None and best_ask_ticks is not None:
+            self.assertLess(best_bid_ticks, best_ask_ticks)
+
+
+class BootstrapTests(OrderBookTestCase):
+    """Hydrating the book from orders already in the database."""
+    
+    def test_crossing_orders_trade_at_earlier_price(self):
+        """Orders that crossed before the book ran trade on bootstrap at the resting order's price."""
+        sell = self.create_order(-1, 5, '100.50')
+        buy = self.create_order(1, 8, '101.00')
+        
+        self.book.submit('bootstrap').result()
+        
+        trade = Trade.objects.get()
+        self.assertEqual(trade.price, Decimal('100.50'))
+        self.assertEqual(trade.quantity, 5)
+        self.assertEqual(self.book.tob_snapshot[:2], (to_ticks(10100), None))
+        self.assertNotCrossed()
+        
+        # The orders' own adds arrive afterwards and must not trade again
+        self.assertEqual(self.book.submit('add', sell).result(), [])
+        self.assertEqual(self.book.submit('add', buy).result(), [])
+        self.assertEqual(Trade.objects.count(), 1)
+        buy.refresh_from_db()
+        self.assertEqual((buy.remaining_quantity, buy.status), (3, 'PARTIALLY_FILLED'))
+
+
+class PersistFailureTests(OrderBookTestCase):
+    """Recovering the book after a match could not be written."""
+    
+    def test_failed_flush_does_not_leave_book_crossed(self):
+        """The failed taker is matched again once the book reloads from the database."""
+        self.book.submit('add', self.create_order(-1, 5, '100.00')).result()
+        buy = self.create_order(1, 5, '101.00')
+        
+        # Only the taker's own flush fails; the reload that follows can write
+        write_matches = OrderBook._write_matches
+        failures = [RuntimeError('database unavailable')]
+        
+        def flaky_write(trades, orders):
+            if failures:
+                raise failures.pop()
+            return write_matches(trades, orders)
+        
+        with mock.patch.object(OrderBook, '_write_matches', side_effect=flaky_write):
+            with self.assertRaises(RuntimeError):
+                self.book.submit('add', buy).result()
+            
+            # The writer re-bootstraps on its own before this runs
+            self.book.submit('snapshot').result()
+        
+        self.assertNotCrossed()
+        self.assertEqual(Trade.objects.get().price, Decimal('100.00'))
+        buy.refresh_from_db()
+        self.assertEqual(buy.status, 'FILLED')
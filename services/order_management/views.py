@@ -2,42 +2,44 @@
 Order Management Service API views.
 Handles order CRUD operations and matching engine with async support.
 """
-import asyncio
 import logging
-import threading
 from rest_framework import status
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from asgiref.sync import async_to_sync
+from django.utils import timezone
 
 
 from shared.models import Order
 from shared.serializers import (
     OrderSerializer, PlaceOrderSerializer, ModifyOrderSerializer,
-    OrderResponseSerializer
+    ORDER_SERIALIZER_COLUMNS, ORDER_VALUE_FIELDS, serialize_order_values
 )
 from shared.utils import validate_order_data
-from .order_book import order_book
+from .order_book import RESTING_STATUSES, registry
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
 
-def _process_order_in_background(order):
-    """Background thread function to process order in order book."""
-    try:
-        trades = async_to_sync(order_book.add_order)(order)
-        logger.info(f"Background processing completed for order {order.order_id}, created {len(trades)} trades")
-    except Exception as e:
-        logger.error(f"Background processing failed for order {order.order_id}: {e}")
+def _process_order_in_background(order, description='order', op='add'):
+    """Queue order on the order book writer and log the outcome when it completes."""
+    def _on_done(future):
+        try:
+            trades = future.result()
+            logger.info(f"Background processing completed for {description} {order.order_id}, created {len(trades)} trades")
+        except Exception as e:
+            logger.error(f"Background processing failed for {description} {order.order_id}: {e}")
+    
+    registry.get(order.symbol).submit(op, order).add_done_callback(_on_done)
 
 
 class OrderViewSet(ModelViewSet):
     """
     Handles order CRUD operations and matching.
     """
-    queryset = Order.objects.all()
+    # Only the columns the serializer renders
+    queryset = Order.objects.only(*ORDER_SERIALIZER_COLUMNS)
     serializer_class = OrderSerializer
     
     def create(self, request):
@@ -49,6 +51,7 @@ class OrderViewSet(ModelViewSet):
             "side": "buy" | "sell",
             "quantity": int,
             "price": float,
+            "symbol": str (optional),
             "user_id": "uuid"
         }
         """        
@@ -71,21 +74,20 @@ class OrderViewSet(ModelViewSet):
             order = Order.objects.create(**order_data)
             logger.info(f"Order {order.order_id} created as ACTIVE")
             
-            # Process order in background thread
-            thread = threading.Thread(target=_process_order_in_background, args=(order,))
-            thread.daemon = True
-            thread.start()
+            # Process order in the background on the order book writer
+            _process_order_in_background(order)
             
             # Return immediate response with ACTIVE status
             return Response({
                 'order_id': str(order.order_id),
                 'message': 'Order placed successfully and is being processed',
                 'status': order.status,
+                'symbol': order.symbol,
                 'side': 'buy' if order.side == 1 else 'sell',
                 'quantity': order.quantity,
                 'remaining_quantity': order.remaining_quantity,
                 'traded_quantity': order.traded_quantity,
-                'price': float(order.price)
+                'price': order.price_cents / 100
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -125,33 +127,20 @@ class OrderViewSet(ModelViewSet):
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
-            new_price = serializer.validated_data['price']
+            new_price_cents = serializer.validated_data['price_cents']
             
-            # Update order with new price and set as ACTIVE
-            order.price = new_price
-            order.status = 'ACTIVE'
-            order.is_active = True
-            order.save()
+            # Update the price only; fill state is owned by the order book
+            order.price_cents = new_price_cents
+            order.save(update_fields=['price_cents', 'updated_at'])
             
-            # Process modified order in background thread
-            def _process_modified_order_in_background():
-                try:
-                    # Cancel existing order from book and re-add with new price
-                    async_to_sync(order_book.cancel_order)(str(order.order_id))
-                    trades = async_to_sync(order_book.add_order)(order)
-                    logger.info(f"Background processing completed for modified order {order.order_id}, created {len(trades)} trades")
-                except Exception as e:
-                    logger.error(f"Background processing failed for modified order {order.order_id}: {e}")
-            
-            thread = threading.Thread(target=_process_modified_order_in_background)
-            thread.daemon = True
-            thread.start()
+            # Re-price in the background; this replaces the resting entry and re-matches
+            _process_order_in_background(order, 'modified order', op='modify')
             
             # Return immediate response
             return Response({
                 'message': 'Order modified successfully and is being processed',
                 'order_id': str(order.order_id),
-                'new_price': float(new_price),
+                'new_price': new_price_cents / 100,
                 'status': order.status
             })
             
@@ -186,7 +175,7 @@ class OrderViewSet(ModelViewSet):
                 )
             
             # Cancel order in order book and database
-            success = async_to_sync(order_book.cancel_order)(str(order.order_id))
+            success = registry.get(order.symbol).submit('cancel', str(order.order_id)).result()
             
             if success:
                 return Response({
@@ -194,10 +183,16 @@ class OrderViewSet(ModelViewSet):
                     'order_id': str(order.order_id)
                 })
             else:
-                # Order not in book, just update database
-                order.status = 'CANCELLED'
-                order.is_active = False
-                order.save()
+                # Order not in book, just update database. Only a still-resting
+                # row is closed, so a fill persisted since it was read survives
+                cancelled = Order.objects.filter(
+                    pk=order.pk, is_active=True, status__in=RESTING_STATUSES
+                ).update(status='CANCELLED', is_active=False, updated_at=timezone.now())
+                if not cancelled:
+                    return Response(
+                        {'error': 'Order cannot be cancelled'}, 
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
                 return Response({
                     'message': 'Order cancelled successfully',
                     'order_id': str(order.order_id)
@@ -219,16 +214,15 @@ class OrderViewSet(ModelViewSet):
         try:
             # Get from database
             try:
-                order = Order.objects.get(order_id=pk)
+                order = Order.objects.values(*ORDER_VALUE_FIELDS).get(order_id=pk)
             except Order.DoesNotExist:
                 return Response(
                     {'error': 'Order not found'}, 
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Return order data
-            order_data = OrderResponseSerializer(order).data
-            return Response(order_data)
+            # Return order data, rendered like the list
+            return Response(serialize_order_values([order])[0])
             
         except Exception as e:
             logger.error(f"Error retrieving order: {e}")
@@ -241,7 +235,7 @@ class OrderViewSet(ModelViewSet):
         """
         List orders with optional filtering and pagination.
         
-        GET /orders/?status=ACTIVE&side=buy&user_id=uuid&page=1
+        GET /orders/?status=ACTIVE&side=buy&symbol=ABC&user_id=uuid&page=1
         """
         try:
             queryset = Order.objects.all()
@@ -256,22 +250,24 @@ class OrderViewSet(ModelViewSet):
                 side_value = 1 if side_filter.lower() == 'buy' else -1
                 queryset = queryset.filter(side=side_value)
             
+            symbol = request.query_params.get('symbol')
+            if symbol:
+                queryset = queryset.filter(symbol=symbol)
+            
             user_id = request.query_params.get('user_id')
             if user_id:
                 queryset = queryset.filter(user_id=user_id)
             
-            # Order by creation time (newest first)
-            queryset = queryset.order_by('-created_at')
+            # Order by creation time (newest first), reading plain rows
+            queryset = queryset.order_by('-created_at').values(*ORDER_VALUE_FIELDS)
             
             # Apply pagination
             page = self.paginate_queryset(queryset)
             if page is not None:
-                serializer = OrderResponseSerializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
+                return self.get_paginated_response(serialize_order_values(page))
             
             # Fallback for when pagination is disabled
-            serializer = OrderResponseSerializer(queryset, many=True)
-            return Response(serializer.data)
+            return Response(serialize_order_values(queryset))
             
         except Exception as e:
             logger.error(f"Error listing orders: {e}")
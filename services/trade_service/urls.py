@@ -8,6 +8,7 @@ urlpatterns = [
     # Trade endpoints
     path('trades/', views.TradeListView.as_view(), name='trades'),
     path('trades/<uuid:trade_id>/', views.TradeDetailView.as_view(), name='trade_detail'),
+    path('settle/batch/', views.TradeSettlementBatchView.as_view(), name='settle_trades_batch'),
     path('settle/<uuid:trade_id>/', views.TradeSettlementView.as_view(), name='settle_trade'),
     
     # Order endpoints
@@ -2,18 +2,27 @@
 Trade Service API views.
 Handles trade operations and order book snapshots.
 """
-import json
 import logging
 from decimal import Decimal
+
+import orjson
+from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
-from shared.models import Order, Trade
-from shared.serializers import TradeSerializer, OrderBookSnapshotSerializer
-from shared.utils import get_redis_client
+from shared.models import Order, Trade, DEFAULT_SYMBOL
+from shared.serializers import (
+    TradeSerializer, TradeSettlementBatchSerializer, OrderBookSnapshotSerializer,
+    TRADE_VALUE_FIELDS, serialize_trade_values
+)
+from shared.utils import get_redis_client, order_book_cache
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -21,12 +30,110 @@ logger = logging.getLogger(__name__)
 # Redis client
 redis_client = get_redis_client()
 
+# Columns read when rendering trades; related orders are joined, not fetched per row
+TRADE_FIELDS = (
+    'trade_id', 'price_cents', 'quantity', 'execution_timestamp', 'is_settled',
+    'settlement_timestamp', 'bid_order', 'ask_order',
+)
+
+
+# Columns rendered by the order list and the order book snapshot, read as plain dicts
+ORDER_LIST_FIELDS = (
+    'order_id', 'side', 'price_cents', 'quantity', 'remaining_quantity', 'traded_quantity',
+    'average_traded_price_cents', 'status', 'is_active', 'created_at', 'updated_at', 'user_id',
+)
+ORDER_BOOK_FIELDS = (
+    'order_id', 'price_cents', 'remaining_quantity', 'quantity', 'traded_quantity',
+    'status', 'created_at', 'user_id',
+)
+
+
+def trade_queryset():
+    """Trades with only the rendered columns loaded; orders are rendered from their foreign keys, no join."""
+    return Trade.objects.only(*TRADE_FIELDS)
+
+
+# Seconds a list total is reused before COUNT(*) runs again
+COUNT_CACHE_TTL = 5
+
+
+def cached_count(queryset, cache_key):
+    """Total row count, read from Redis when a recent value is cached."""
+    cached = redis_client.get(cache_key)
+    if cached is not None:
+        return int(cached)
+    
+    count = queryset.count()
+    redis_client.set(cache_key, count, ex=COUNT_CACHE_TTL)
+    return count
+
+
+def offset_page(queryset, page, page_size):
+    """
+    Rows of one page of an ordered queryset.
+    
+    Fetches one extra row to tell whether there is a next page, so no
+    COUNT is needed. Returns (rows, has_next).
+    """
+    offset = (page - 1) * page_size
+    rows = list(queryset[offset:offset + page_size + 1].iterator(chunk_size=page_size + 1))
+    return rows[:page_size], len(rows) > page_size
+
+
+def page_info(request, page, page_size, has_next, queryset, cache_key):
+    """Offset pagination block; totals are only counted when ?with_count=1 asks for them."""
+    pagination = {
+        'page': page,
+        'page_size': page_size,
+        'has_next': has_next,
+        'has_previous': page > 1,
+    }
+    if request.GET.get('with_count') in ('1', 'true'):
+        total_count = cached_count(queryset, cache_key)
+        pagination['total_count'] = total_count
+        pagination['total_pages'] = max(1, -(-total_count // page_size))
+    return pagination
+
+
+def keyset_page(queryset, pk_name, cursor, cursor_id, page_size):
+    """
+    Seek to the rows after (cursor, cursor_id) in newest-first order.
+    
+    Fetches one extra row to tell whether there is a next page, so no
+    COUNT is needed. Returns (rows, has_next, next_cursor, next_cursor_id).
+    """
+    queryset = queryset.order_by('-created_at', f'-{pk_name}')
+    if cursor:
+        # '+' in an unencoded offset arrives as a space
+        cursor_ts = parse_datetime(cursor.replace(' ', '+'))
+        if cursor_ts is None:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        seek = Q(created_at__lt=cursor_ts)
+        if cursor_id:
+            seek |= Q(created_at=cursor_ts, **{f'{pk_name}__lt': cursor_id})
+        queryset = queryset.filter(seek)
+    
+    rows = list(queryset[:page_size + 1])
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    if has_next:
+        last = rows[-1]
+        # Rows are model instances or .values() dicts
+        if isinstance(last, dict):
+            created_at, pk = last['created_at'], last[pk_name]
+        else:
+            created_at, pk = last.created_at, getattr(last, pk_name)
+        return rows, True, created_at.isoformat(), str(pk)
+    return rows, False, None, None
+
 
 class TradeListView(APIView):
     """
     Get all trades with pagination.
     
-    GET /trades/?page=1&page_size=20
+    GET /trades/?page=1&page_size=20&with_count=1
+    GET /trades/?cursor=<iso_ts>&cursor_id=<uuid>&page_size=20 (keyset, no COUNT)
     """
     
     def get(self, request):
@@ -39,28 +146,33 @@ class TradeListView(APIView):
             if page_size < 1 or page_size > 100:
                 page_size = 20
             
-            # Get trades with pagination
-            trades = Trade.objects.all().order_by('-created_at')
-            paginator = Paginator(trades, page_size)
-            
-            try:
-                page_obj = paginator.page(page)
-            except:
-                page_obj = paginator.page(1)
+            # Keyset pagination when a cursor is given (an empty cursor is the first page)
+            if 'cursor' in request.GET:
+                try:
+                    rows, has_next, next_cursor, next_cursor_id = keyset_page(
+                        Trade.objects.values(*TRADE_VALUE_FIELDS), 'trade_id',
+                        request.GET.get('cursor'), request.GET.get('cursor_id'), page_size
+                    )
+                except (ValueError, ValidationError) as e:
+                    return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                
+                return Response({
+                    'trades': serialize_trade_values(rows),
+                    'pagination': {
+                        'page_size': page_size,
+                        'has_next': has_next,
+                        'next_cursor': next_cursor,
+                        'next_cursor_id': next_cursor_id,
+                    }
+                })
             
-            # Serialize trades
-            serializer = TradeSerializer(page_obj.object_list, many=True)
+            # Get trades with pagination, as plain rows
+            trades = Trade.objects.order_by('-created_at')
+            rows, has_next = offset_page(trades.values(*TRADE_VALUE_FIELDS), page, page_size)
             
             return Response({
-                'trades': serializer.data,
-                'pagination': {
-                    'page': page,
-                    'page_size': page_size,
-                    'total_pages': paginator.num_pages,
-                    'total_count': paginator.count,
-                    'has_next': page_obj.has_next(),
-                    'has_previous': page_obj.has_previous(),
-                }
+                'trades': serialize_trade_values(rows),
+                'pagination': page_info(request, page, page_size, has_next, trades, 'trades:count')
             })
             
         except Exception as e:
@@ -81,7 +193,7 @@ class TradeDetailView(APIView):
     def get(self, request, trade_id):
         try:
             try:
-                trade = Trade.objects.get(trade_id=trade_id)
+                trade = trade_queryset().get(trade_id=trade_id)
             except Trade.DoesNotExist:
                 return Response(
                     {'error': 'Trade not found'}, 
@@ -125,8 +237,8 @@ class TradeSettlementView(APIView):
             
             # Settle the trade
             trade.is_settled = True
-            trade.settled_at = timezone.now()
-            trade.save()
+            trade.settlement_timestamp = timezone.now()
+            trade.save(update_fields=['is_settled', 'settlement_timestamp'])
             
             logger.info(f"Trade {trade_id} settled successfully")
             
@@ -145,11 +257,57 @@ class TradeSettlementView(APIView):
             )
 
 
+class TradeSettlementBatchView(APIView):
+    """
+    Settle many trades in one request.
+    
+    POST /settle/batch/ {"trade_ids": ["<uuid>", ...]}
+    """
+    
+    def post(self, request):
+        try:
+            serializer = TradeSettlementBatchSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            
+            trade_ids = set(serializer.validated_data['trade_ids'])
+            
+            # Lock the unsettled rows, then settle them with a single UPDATE
+            with transaction.atomic():
+                settled_ids = list(
+                    Trade.objects.select_for_update()
+                    .filter(trade_id__in=trade_ids, is_settled=False)
+                    .values_list('trade_id', flat=True)
+                )
+                Trade.objects.filter(trade_id__in=settled_ids).update(
+                    is_settled=True,
+                    settlement_timestamp=timezone.now()
+                )
+            
+            logger.info(f"Settled {len(settled_ids)} of {len(trade_ids)} trades in batch")
+            
+            settled = set(settled_ids)
+            return Response({
+                'message': 'Trades settled successfully',
+                'settled_count': len(settled_ids),
+                'settled_trade_ids': [str(trade_id) for trade_id in settled_ids],
+                'skipped_trade_ids': [str(trade_id) for trade_id in trade_ids - settled]
+            })
+            
+        except Exception as e:
+            logger.error(f"Error settling trade batch: {e}")
+            return Response(
+                {'error': 'Failed to settle trades'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 class OrderBookSnapshotView(APIView):
     """
-    Get order book snapshot from database.
+    Get order book snapshot from the Redis book mirror, or the database
+    when the mirror is not available.
     
-    GET /orderbook/?depth=5
+    GET /orderbook/?depth=5&symbol=DEFAULT
     """
     
     def get(self, request):
@@ -161,58 +319,62 @@ class OrderBookSnapshotView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            logger.info(f"Order book snapshot requested with depth {depth}")
+            symbol = request.GET.get('symbol', DEFAULT_SYMBOL)
+            
+            logger.info(f"Order book snapshot requested for {symbol} with depth {depth}")
+            
+            response_key = order_book_cache.response_key(symbol, depth)
+            cached_response = redis_client.get(response_key)
+            if cached_response:
+                # Already rendered JSON; served without decoding and re-encoding
+                return HttpResponse(cached_response, content_type='application/json')
+            
+            cached = self._from_cache(symbol, depth)
+            if cached is not None:
+                buy_entries, sell_entries = cached
+                orderbook_data = {
+                    'buy_orders': buy_entries,
+                    'sell_orders': sell_entries,
+                    'timestamp': timezone.now().isoformat(),
+                    'symbol': symbol,
+                    'depth': depth,
+                    'total_buy_orders': len(buy_entries),
+                    'total_sell_orders': len(sell_entries)
+                }
+                redis_client.set(response_key, orjson.dumps(orderbook_data), ex=settings.ORDER_BOOK_RESPONSE_CACHE_TTL)
+                return Response(orderbook_data)
             
             # Get active orders from database
             buy_orders = Order.objects.filter(
+                symbol=symbol,
                 side=1,  # Buy
                 status__in=['ACTIVE', 'PARTIALLY_FILLED'],
                 remaining_quantity__gt=0
-            ).order_by('-price', 'created_at')[:depth]
+            ).order_by('-price_cents', 'created_at')[:depth]
             
             sell_orders = Order.objects.filter(
+                symbol=symbol,
                 side=-1,  # Sell
                 status__in=['ACTIVE', 'PARTIALLY_FILLED'],
                 remaining_quantity__gt=0
-            ).order_by('price', 'created_at')[:depth]
+            ).order_by('price_cents', 'created_at')[:depth]
             
-            # Prepare order book data
+            # Prepare order book data; buys highest price first, sells lowest first.
+            # Totals are the rows returned, counted from the fetched lists.
+            buy_entries = [self._book_entry(row) for row in buy_orders.values(*ORDER_BOOK_FIELDS)]
+            sell_entries = [self._book_entry(row) for row in sell_orders.values(*ORDER_BOOK_FIELDS)]
             orderbook_data = {
-                'buy_orders': [],
-                'sell_orders': [],
+                'buy_orders': buy_entries,
+                'sell_orders': sell_entries,
                 'timestamp': timezone.now().isoformat(),
+                'symbol': symbol,
                 'depth': depth,
-                'total_buy_orders': buy_orders.count(),
-                'total_sell_orders': sell_orders.count()
+                'total_buy_orders': len(buy_entries),
+                'total_sell_orders': len(sell_entries)
             }
             
-            # Format buy orders (highest price first)
-            for order in buy_orders:
-                orderbook_data['buy_orders'].append({
-                    'order_id': str(order.order_id),
-                    'price': float(order.price),
-                    'quantity': order.remaining_quantity,
-                    'total_quantity': order.quantity,
-                    'traded_quantity': order.traded_quantity,
-                    'status': order.status,
-                    'created_at': order.created_at.isoformat(),
-                    'user_id': str(order.user_id) if order.user_id else None
-                })
-            
-            # Format sell orders (lowest price first)
-            for order in sell_orders:
-                orderbook_data['sell_orders'].append({
-                    'order_id': str(order.order_id),
-                    'price': float(order.price),
-                    'quantity': order.remaining_quantity,
-                    'total_quantity': order.quantity,
-                    'traded_quantity': order.traded_quantity,
-                    'status': order.status,
-                    'created_at': order.created_at.isoformat(),
-                    'user_id': str(order.user_id) if order.user_id else None
-                })
-            
             logger.info(f"Order book snapshot generated with {len(orderbook_data['buy_orders'])} buy orders and {len(orderbook_data['sell_orders'])} sell orders")
+            redis_client.set(response_key, orjson.dumps(orderbook_data), ex=settings.ORDER_BOOK_RESPONSE_CACHE_TTL)
             return Response(orderbook_data)
             
         except Exception as e:
@@ -221,13 +383,37 @@ class OrderBookSnapshotView(APIView):
                 {'error': 'Failed to get order book snapshot'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @staticmethod
+    def _book_entry(row):
+        """Render one resting order row from .values()."""
+        return {
+            'order_id': str(row['order_id']),
+            'price': row['price_cents'] / 100,
+            'quantity': row['remaining_quantity'],
+            'total_quantity': row['quantity'],
+            'traded_quantity': row['traded_quantity'],
+            'status': row['status'],
+            'created_at': row['created_at'].isoformat(),
+            'user_id': str(row['user_id']) if row['user_id'] else None
+        }
+    
+    @staticmethod
+    def _from_cache(symbol, depth):
+        """Read the snapshot from the Redis book mirror; None means use the database."""
+        try:
+            return order_book_cache.read_book(redis_client, symbol, depth)
+        except Exception as e:
+            logger.warning(f"Order book mirror unavailable for {symbol}: {e}")
+            return None
 
 
 class OrdersListView(APIView):
     """
     Get all orders with pagination.
     
-    GET /orders/?page=1&page_size=20&status=ACTIVE
+    GET /orders/?page=1&page_size=20&status=ACTIVE&with_count=1
+    GET /orders/?cursor=<iso_ts>&cursor_id=<uuid>&page_size=20&status=ACTIVE (keyset, no COUNT)
     """
     
     def get(self, request):
@@ -256,45 +442,41 @@ class OrdersListView(APIView):
             if user_id:
                 orders = orders.filter(user_id=user_id)
             
+            # Keyset pagination when a cursor is given (an empty cursor is the first page)
+            if 'cursor' in request.GET:
+                try:
+                    rows, has_next, next_cursor, next_cursor_id = keyset_page(
+                        orders.values(*ORDER_LIST_FIELDS), 'order_id',
+                        request.GET.get('cursor'), request.GET.get('cursor_id'), page_size
+                    )
+                except (ValueError, ValidationError) as e:
+                    return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                
+                return Response({
+                    'orders': [self._order_data(order) for order in rows],
+                    'pagination': {
+                        'page_size': page_size,
+                        'has_next': has_next,
+                        'next_cursor': next_cursor,
+                        'next_cursor_id': next_cursor_id,
+                    }
+                })
+            
             # Order by creation time (newest first)
             orders = orders.order_by('-created_at')
             
-            # Paginate
-            paginator = Paginator(orders, page_size)
-            
-            try:
-                page_obj = paginator.page(page)
-            except:
-                page_obj = paginator.page(1)
+            rows, has_next = offset_page(orders.values(*ORDER_LIST_FIELDS), page, page_size)
             
             # Serialize orders
-            orders_data = []
-            for order in page_obj.object_list:
-                orders_data.append({
-                    'order_id': str(order.order_id),
-                    'side': 'buy' if order.side == 1 else 'sell',
-                    'price': float(order.price),
-                    'quantity': order.quantity,
-                    'remaining_quantity': order.remaining_quantity,
-                    'traded_quantity': order.traded_quantity,
-                    'average_traded_price': float(order.average_traded_price),
-                    'status': order.status,
-                    'is_active': order.is_active,
-                    'created_at': order.created_at.isoformat(),
-                    'updated_at': order.updated_at.isoformat(),
-                    'user_id': str(order.user_id) if order.user_id else None
-                })
+            orders_data = [self._order_data(order) for order in rows]
             
             return Response({
                 'orders': orders_data,
-                'pagination': {
-                    'page': page,
-                    'page_size': page_size,
-                    'total_pages': paginator.num_pages,
-                    'total_count': paginator.count,
-                    'has_next': page_obj.has_next(),
-                    'has_previous': page_obj.has_previous(),
-                }
+                # The total is cached per filter combination
+                'pagination': page_info(
+                    request, page, page_size, has_next, orders,
+                    f"orders:count:{status_filter}:{side_filter}:{user_id}"
+                )
             })
             
         except Exception as e:
@@ -303,3 +485,21 @@ class OrdersListView(APIView):
                 {'error': 'Failed to get orders'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @staticmethod
+    def _order_data(row):
+        """Render one order row from .values() for the list response."""
+        return {
+            'order_id': str(row['order_id']),
+            'side': 'buy' if row['side'] == 1 else 'sell',
+            'price': row['price_cents'] / 100,
+            'quantity': row['quantity'],
+            'remaining_quantity': row['remaining_quantity'],
+            'traded_quantity': row['traded_quantity'],
+            'average_traded_price': row['average_traded_price_cents'] / 100,
+            'status': row['status'],
+            'is_active': row['is_active'],
+            'created_at': row['created_at'].isoformat(),
+            'updated_at': row['updated_at'].isoformat(),
+            'user_id': str(row['user_id']) if row['user_id'] else None
+        }
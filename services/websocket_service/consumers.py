@@ -1,180 +1,209 @@
 """
 WebSocket consumers for real-time updates.
 """
-import json
 import asyncio
 import logging
-import aiohttp
+import time
+from typing import Dict, Tuple
+
+import orjson
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from shared.models import Order, Trade, DEFAULT_SYMBOL
+from shared.utils import get_redis_client, order_book_cache
 
 # Setup logging using standard Django logging
 logger = logging.getLogger(__name__)
 
+# Order book fetches shared by consumers in this process, per symbol: the one
+# in flight, and the last serialized snapshot with the monotonic time it was fetched
+_inflight_books: Dict[str, asyncio.Future] = {}
+_recent_books: Dict[str, Tuple[float, str]] = {}
+
 
 class TradeConsumer(AsyncWebsocketConsumer):
     """
-    WebSocket consumer for trade notifications.
+    WebSocket consumer for trade notifications, pushed as trades execute.
     """
     
+    group_name = settings.CHANNEL_GROUPS['trades']
+    
     async def connect(self):
         """Handle WebSocket connection."""
-        self.update_task = None
         await self.accept()
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         
-        # Start periodic updates for trades
-        self.update_task = asyncio.create_task(self.send_periodic_trades())
+        # Start from the latest trades; new ones are pushed as they execute
+        await self.send(text_data=orjson.dumps({
+            "trades": await self.get_trades_data()
+        }).decode())
         logger.info(f"Trade consumer connected: {self.channel_name}")
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        if self.update_task:
-            self.update_task.cancel()
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
         logger.info(f"Trade consumer disconnected: {self.channel_name}")
     
     async def get_trades_data(self):
-        """Fetch trades data from trade service."""
+        """Fetch the latest 5 trades straight from the database."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get('http://localhost:8001/trades/') as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get("trades", [])[:5]  # Get latest 5 trades
+            latest = Trade.objects.order_by('-execution_timestamp')[:5]
+            return [trade.to_dict() async for trade in latest]
         except Exception as e:
             logger.error(f"Error fetching trades data: {e}")
             return []
     
-    async def send_periodic_trades(self):
-        """Send trade updates every second."""
-        try:
-            while True:
-                # Get trades data from trade service
-                trades_data = await self.get_trades_data()
-                
-                # Send to WebSocket client
-                await self.send(text_data=json.dumps({
-                    "trades": trades_data
-                }))
-                
-                # Wait 1 second before next update
-                await asyncio.sleep(1)
-                
-        except asyncio.CancelledError:
-            logger.info("Trade periodic updates cancelled")
-        except Exception as e:
-            logger.error(f"Error in trade periodic updates: {e}")
+    async def trades_update(self, event):
+        """Forward trades pushed by the order book to the client, already serialized."""
+        await self.send(text_data=event["text"])
     
     async def receive(self, text_data):
         """Handle messages from WebSocket client."""
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             message_type = data.get('type')
             
             if message_type == 'ping':
-                await self.send(text_data=json.dumps({'type': 'pong'}))
+                await self.send(text_data=orjson.dumps({'type': 'pong'}).decode())
             else:
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=orjson.dumps({
                     'type': 'error',
                     'message': 'Unknown message type'
-                }))
+                }).decode())
                 
-        except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+        except orjson.JSONDecodeError:
+            await self.send(text_data=orjson.dumps({
                 'type': 'error',
                 'message': 'Invalid JSON'
-            }))
+            }).decode())
 
 
 class OrderBookConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer for order book snapshots.
-    Sends order book snapshots with 5 levels of bid/ask depth every second.
+    Sends 5 levels of bid/ask depth on connect and whenever the book changes.
     """
     
+    group_name = order_book_cache.update_group(DEFAULT_SYMBOL)
+    
     async def connect(self):
         """Handle WebSocket connection."""
-        self.update_task = None
         await self.accept()
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         
-        # Start periodic updates
-        self.update_task = asyncio.create_task(self.send_periodic_updates())
+        # Start from the current snapshot; changes are pushed by the order book
+        await self.send(text_data=await self.get_orderbook_message())
         logger.info(f"Order book consumer connected: {self.channel_name}")
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        if self.update_task:
-            self.update_task.cancel()
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
         logger.info(f"Order book consumer disconnected: {self.channel_name}")
     
-    async def get_orderbook_data(self):
-        """Fetch order book data from trade service."""
+    async def get_orderbook_message(self):
+        """
+        Serialized order book depth, coalescing fetches from consumers that connect together.
+        
+        A snapshot younger than ORDER_BOOK_RESPONSE_CACHE_TTL is reused, and a
+        fetch already in flight is awaited rather than repeated, so each
+        snapshot is serialized once however many clients it is sent to.
+        """
+        symbol = DEFAULT_SYMBOL
+        recent = _recent_books.get(symbol)
+        if recent is not None and time.monotonic() - recent[0] < settings.ORDER_BOOK_RESPONSE_CACHE_TTL:
+            return recent[1]
+        
+        fetch = _inflight_books.get(symbol)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch_orderbook_message(symbol))
+            _inflight_books[symbol] = fetch
+            fetch.add_done_callback(lambda _: _inflight_books.pop(symbol, None))
+        
+        # Shielded so one client disconnecting does not cancel the others' fetch
+        return await asyncio.shield(fetch)
+    
+    @classmethod
+    async def _fetch_orderbook_message(cls, symbol):
+        """Fetch order book depth from Redis, or the database when Redis has no book, and serialize it."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get('http://localhost:8001/orderbook/') as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Convert buy_orders to bids format (price, quantity)
-                        bids = []
-                        for order in data.get("buy_orders", [])[:5]:
-                            bids.append({
-                                "price": order["price"],
-                                "quantity": order["quantity"]
-                            })
-                        
-                        # Convert sell_orders to asks format (price, quantity)
-                        asks = []
-                        for order in data.get("sell_orders", [])[:5]:
-                            asks.append({
-                                "price": order["price"],
-                                "quantity": order["quantity"]
-                            })
-                        
-                        return {
-                            "bids": bids,
-                            "asks": asks
-                        }
+            data = await sync_to_async(cls._cached_book, thread_sensitive=False)(symbol)
+            if data is not None:
+                data = cls._top_levels(data)
+            else:
+                data = {
+                    "bids": await cls._resting_levels(symbol, 1, '-price_cents'),
+                    "asks": await cls._resting_levels(symbol, -1, 'price_cents')
+                }
         except Exception as e:
             logger.error(f"Error fetching orderbook data: {e}")
             # Fallback to empty data
-            return {"bids": [], "asks": []}
+            return orjson.dumps({"bids": [], "asks": []}).decode()
+        
+        message = orjson.dumps(data).decode()
+        _recent_books[symbol] = (time.monotonic(), message)
+        return message
     
-    async def send_periodic_updates(self):
-        """Send order book snapshots every second."""
-        try:
-            while True:
-                # Get order book data from trade service
-                orderbook_data = await self.get_orderbook_data()
-                
-                # Send to WebSocket client
-                await self.send(text_data=json.dumps({
-                    "bids": orderbook_data["bids"],
-                    "asks": orderbook_data["asks"]
-                }))
-                
-                # Wait 1 second before next update
-                await asyncio.sleep(1)
-                
-        except asyncio.CancelledError:
-            logger.info("Order book periodic updates cancelled")
-        except Exception as e:
-            logger.error(f"Error in order book periodic updates: {e}")
+    @staticmethod
+    def _cached_book(symbol):
+        """Read the cached snapshot response, else the book mirror; None when neither is there."""
+        redis_client = get_redis_client()
+        depth = settings.ORDER_BOOK_DEPTH
+        
+        cached = redis_client.get(order_book_cache.response_key(symbol, depth))
+        if cached:
+            return orjson.loads(cached)
+        
+        book = order_book_cache.read_book(redis_client, symbol, depth)
+        if book is not None:
+            return {"buy_orders": book[0], "sell_orders": book[1]}
+        return None
+    
+    @staticmethod
+    async def _resting_levels(symbol, side, price_ordering):
+        """Top resting orders on one side as (price, quantity), via the async ORM."""
+        rows = Order.objects.filter(
+            symbol=symbol,
+            side=side,
+            status__in=['ACTIVE', 'PARTIALLY_FILLED'],
+            remaining_quantity__gt=0
+        ).order_by(price_ordering, 'created_at').values_list(
+            'price_cents', 'remaining_quantity'
+        )[:settings.ORDER_BOOK_DEPTH]
+        return [{"price": price_cents / 100, "quantity": quantity} async for price_cents, quantity in rows]
+    
+    @staticmethod
+    def _top_levels(data):
+        """Reduce an /orderbook/ response to (price, quantity) bids and asks."""
+        depth = settings.ORDER_BOOK_DEPTH
+        return {
+            "bids": [{"price": order["price"], "quantity": order["quantity"]}
+                     for order in data.get("buy_orders", [])[:depth]],
+            "asks": [{"price": order["price"], "quantity": order["quantity"]}
+                     for order in data.get("sell_orders", [])[:depth]]
+        }
+    
+    async def book_update(self, event):
+        """Forward a depth update pushed by the order book to the client, already serialized."""
+        await self.send(text_data=event["text"])
     
     async def receive(self, text_data):
         """Handle messages from WebSocket client."""
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             message_type = data.get('type')
             
             if message_type == 'ping':
-                await self.send(text_data=json.dumps({'type': 'pong'}))
+                await self.send(text_data=orjson.dumps({'type': 'pong'}).decode())
             else:
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=orjson.dumps({
                     'type': 'error',
                     'message': 'Unknown message type'
-                }))
+                }).decode())
                 
-        except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+        except orjson.JSONDecodeError:
+            await self.send(text_data=orjson.dumps({
                 'type': 'error',
                 'message': 'Invalid JSON'
-            }))
+            }).decode())
@@ -14,14 +14,6 @@ INSTALLED_APPS += [
 
 # Channels configuration
 ASGI_APPLICATION = 'websocket_service.asgi.application'
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        'CONFIG': {
-            'hosts': [(REDIS_HOST, REDIS_PORT)],
-        },
-    },
-}
 
 # Service URLs
 ROOT_URLCONF = 'services.websocket_service.urls'
@@ -76,6 +76,17 @@ REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.environ.get('REDIS_PORT', '6379'))
 REDIS_DB = int(os.environ.get('REDIS_DB', '0'))
 REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', None)
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', '50'))
+
+# Channels layer, shared so every service can push to WebSocket groups
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [(REDIS_HOST, REDIS_PORT)],
+        },
+    },
+}
 
 # Cache configuration for health checks - using simple cache instead of Redis
 CACHES = {
@@ -119,7 +130,7 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [],
     'DEFAULT_PERMISSION_CLASSES': [],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'shared.utils.renderers.OrjsonRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
@@ -137,6 +148,9 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Order API specific settings
 ORDER_BOOK_DEPTH = 5
+ORDER_BOOK_SNAPSHOT_INTERVAL = 5  # seconds between warm-start snapshots in Redis
+ORDER_BOOK_SNAPSHOT_TTL = 3600  # 1 hour
+ORDER_BOOK_RESPONSE_CACHE_TTL = 1  # seconds a rendered /orderbook/ response is shared
 DEFAULT_ORDER_TIMEOUT = 300  # 5 minutes
 MAX_ORDER_QUANTITY = 1000000
 MAX_ORDER_PRICE = 999999.99
@@ -154,3 +168,9 @@ REDIS_CHANNELS = {
     'order_book_updates': 'order_book_updates',
     'order_updates': 'order_updates',
 }
+
+# Channels groups WebSocket consumers join for pushed updates
+CHANNEL_GROUPS = {
+    'trades': 'trades',
+    'order_book': 'orderbook',
+}
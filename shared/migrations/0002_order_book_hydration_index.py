@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-15 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['side', 'is_active', 'status', 'price'], name='shared_orde_side_91c684_idx'),
+        ),
+    ]
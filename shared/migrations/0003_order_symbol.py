@@ -0,0 +1,22 @@
+# Generated by Django 4.2.24 on 2026-10-15 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0002_order_book_hydration_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='symbol',
+            field=models.CharField(default='DEFAULT', help_text='Instrument the order trades; each symbol has its own order book', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['symbol', 'is_active', 'status'], name='shared_orde_symbol_e6ad4b_idx'),
+        ),
+    ]
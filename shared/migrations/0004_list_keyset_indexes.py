@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-15 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0003_order_symbol'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'order_id'], name='shared_orde_created_ca80f2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['created_at', 'trade_id'], name='shared_trad_created_99bc22_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-15 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0004_list_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('remaining_quantity__gt', 0), ('side', 1), ('status__in', ['ACTIVE', 'PARTIALLY_FILLED'])), fields=['symbol', '-price', 'created_at'], name='ob_active_bid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('remaining_quantity__gt', 0), ('side', -1), ('status__in', ['ACTIVE', 'PARTIALLY_FILLED'])), fields=['symbol', 'price', 'created_at'], name='ob_active_ask_idx'),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 4.2.24 on 2026-10-15 08:20
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def prices_to_cents(apps, schema_editor):
+    """Copy Decimal prices into the new integer-cent columns."""
+    Order = apps.get_model('shared', 'Order')
+    Trade = apps.get_model('shared', 'Trade')
+    
+    orders = list(Order.objects.only('order_id', 'price', 'average_traded_price'))
+    for order in orders:
+        order.price_cents = int(order.price * 100)
+        order.average_traded_price_cents = int(order.average_traded_price * 100)
+    Order.objects.bulk_update(orders, ['price_cents', 'average_traded_price_cents'], batch_size=500)
+    
+    trades = list(Trade.objects.only('trade_id', 'price'))
+    for trade in trades:
+        trade.price_cents = int(trade.price * 100)
+    Trade.objects.bulk_update(trades, ['price_cents'], batch_size=500)
+
+
+def cents_to_prices(apps, schema_editor):
+    """Copy integer-cent columns back into Decimal prices."""
+    Order = apps.get_model('shared', 'Order')
+    Trade = apps.get_model('shared', 'Trade')
+    
+    orders = list(Order.objects.only('order_id', 'price_cents', 'average_traded_price_cents'))
+    for order in orders:
+        order.price = Decimal(order.price_cents).scaleb(-2)
+        order.average_traded_price = Decimal(order.average_traded_price_cents).scaleb(-2)
+    Order.objects.bulk_update(orders, ['price', 'average_traded_price'], batch_size=500)
+    
+    trades = list(Trade.objects.only('trade_id', 'price_cents'))
+    for trade in trades:
+        trade.price = Decimal(trade.price_cents).scaleb(-2)
+    Trade.objects.bulk_update(trades, ['price'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0005_order_book_active_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='price_cents',
+            field=models.PositiveBigIntegerField(default=0, help_text='Price per unit, in cents'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='average_traded_price_cents',
+            field=models.PositiveBigIntegerField(default=0, help_text='Average price of traded quantity, in cents'),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='price_cents',
+            field=models.PositiveBigIntegerField(default=0, help_text='Execution price, in cents'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(prices_to_cents, cents_to_prices),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='shared_orde_side_cac2af_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='shared_orde_side_91c684_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='ob_active_bid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='ob_active_ask_idx',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='price',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='average_traded_price',
+        ),
+        migrations.RemoveField(
+            model_name='trade',
+            name='price',
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['side', 'price_cents', 'created_at'], name='shared_orde_side_ed3215_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['side', 'is_active', 'status', 'price_cents'], name='shared_orde_side_2592e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('remaining_quantity__gt', 0), ('side', 1), ('status__in', ['ACTIVE', 'PARTIALLY_FILLED'])), fields=['symbol', '-price_cents', 'created_at'], name='ob_active_bid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('remaining_quantity__gt', 0), ('side', -1), ('status__in', ['ACTIVE', 'PARTIALLY_FILLED'])), fields=['symbol', 'price_cents', 'created_at'], name='ob_active_ask_idx'),
+        ),
+    ]
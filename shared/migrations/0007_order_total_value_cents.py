@@ -0,0 +1,27 @@
+# Generated by Django 4.2.24 on 2026-10-15 08:24
+
+from django.db import migrations, models
+
+
+def backfill_total_value(apps, schema_editor):
+    """Seed running totals of existing orders from their stored average."""
+    Order = apps.get_model('shared', 'Order')
+    Order.objects.filter(traded_quantity__gt=0).update(
+        total_value_cents=models.F('average_traded_price_cents') * models.F('traded_quantity')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0006_price_cents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='total_value_cents',
+            field=models.PositiveBigIntegerField(default=0, help_text='Sum of price times quantity over all fills, in cents'),
+        ),
+        migrations.RunPython(backfill_total_value, migrations.RunPython.noop),
+    ]
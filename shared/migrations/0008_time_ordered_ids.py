@@ -0,0 +1,29 @@
+# Generated by Django 4.2.24 on 2026-10-15 08:29
+
+from django.db import migrations, models
+import shared.models.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0007_order_total_value_cents'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='order_id',
+            field=models.UUIDField(default=shared.models.ids.uuid7, editable=False, help_text='Unique identifier for the order', primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='trade',
+            name='trade_id',
+            field=models.UUIDField(default=shared.models.ids.uuid7, editable=False, help_text='Unique identifier for the trade', primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='user_id',
+            field=models.UUIDField(default=shared.models.ids.uuid7, editable=False, help_text='Unique identifier for the user', primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-15 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0008_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='shared_orde_user_id_a703d5_idx',
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user_id', '-created_at', '-order_id'], name='ord_user_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-15 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0009_order_user_recent_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['symbol', 'updated_at'], name='ord_symbol_updated_idx'),
+        ),
+    ]
@@ -1,5 +1,5 @@
-from .order import Order
+from .order import Order, DEFAULT_SYMBOL
 from .trade import Trade
 from .user import User
 
-__all__ = ['Order', 'Trade', 'User']
+__all__ = ['Order', 'Trade', 'User', 'DEFAULT_SYMBOL']
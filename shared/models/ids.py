@@ -0,0 +1,23 @@
+"""
+Time-ordered primary keys for the OrderAPI models.
+
+Keys are UUIDv7-style (RFC 9562): a 48-bit millisecond timestamp followed
+by random bits. They fit the existing UUID columns, and because new keys
+sort after old ones, inserts land at the right edge of primary key
+B-trees instead of at random pages.
+"""
+import os
+import time
+import uuid
+
+_VERSION_7 = 0x7 << 76
+_VARIANT_RFC4122 = 0x2 << 62
+_RANDOM_MASK = ((1 << 80) - 1) & ~(0xF << 76) & ~(0x3 << 62)
+
+
+def uuid7() -> uuid.UUID:
+    """New time-ordered UUID for use as a model primary key default."""
+    timestamp_ms = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), 'big')
+    return uuid.UUID(int=(timestamp_ms & 0xFFFFFFFFFFFF) << 80 | _VERSION_7 | _VARIANT_RFC4122
+                     | random_bits & _RANDOM_MASK)
@@ -2,12 +2,18 @@
 Order model for the OrderAPI microservices system.
 """
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
-import uuid
 import logging
 
+from .ids import uuid7
+from .prices import cents_property, to_cents
+
 logger = logging.getLogger(__name__)
 
+# Symbol used for orders placed without one
+DEFAULT_SYMBOL = 'DEFAULT'
+
 
 class Order(models.Model):
     """
@@ -31,12 +37,17 @@ class Order(models.Model):
     # Primary key
     order_id = models.UUIDField(
         primary_key=True, 
-        default=uuid.uuid4, 
+        default=uuid7, 
         editable=False,
         help_text="Unique identifier for the order"
     )
     
     # Order details
+    symbol = models.CharField(
+        max_length=20,
+        default=DEFAULT_SYMBOL,
+        help_text="Instrument the order trades; each symbol has its own order book"
+    )
     side = models.IntegerField(
         choices=SIDE_CHOICES, 
         help_text="1 for buy, -1 for sell"
@@ -44,10 +55,8 @@ class Order(models.Model):
     quantity = models.PositiveIntegerField(
         help_text="Total quantity to buy/sell"
     )
-    price = models.DecimalField(
-        max_digits=10, 
-        decimal_places=2, 
-        help_text="Price per unit"
+    price_cents = models.PositiveBigIntegerField(
+        help_text="Price per unit, in cents"
     )
     
     # Execution tracking
@@ -58,11 +67,13 @@ class Order(models.Model):
         default=0, 
         help_text="Quantity that has been traded"
     )
-    average_traded_price = models.DecimalField(
-        max_digits=10, 
-        decimal_places=2, 
+    average_traded_price_cents = models.PositiveBigIntegerField(
         default=0, 
-        help_text="Average price of traded quantity"
+        help_text="Average price of traded quantity, in cents"
+    )
+    total_value_cents = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Sum of price times quantity over all fills, in cents"
     )
     
     # Status and lifecycle
@@ -91,18 +102,51 @@ class Order(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['side', 'price', 'created_at']),
+            models.Index(fields=['side', 'price_cents', 'created_at']),
             models.Index(fields=['is_active']),
             models.Index(fields=['status']),
-            models.Index(fields=['user_id']),
+            # Per-user listings filter on user_id and page newest first, with
+            # order_id breaking created_at ties for keyset cursors
+            models.Index(fields=['user_id', '-created_at', '-order_id'], name='ord_user_recent_idx'),
+            models.Index(fields=['side', 'is_active', 'status', 'price_cents']),
+            models.Index(fields=['symbol', 'is_active', 'status']),
+            models.Index(fields=['created_at', 'order_id']),
+            # Order book warm starts re-read a symbol's orders changed since a snapshot
+            models.Index(fields=['symbol', 'updated_at'], name='ord_symbol_updated_idx'),
+            # Partial indexes over resting orders only, one per side so each
+            # book query reads in its own price-time order
+            models.Index(
+                fields=['symbol', '-price_cents', 'created_at'],
+                name='ob_active_bid_idx',
+                condition=Q(side=1, status__in=['ACTIVE', 'PARTIALLY_FILLED'], remaining_quantity__gt=0),
+            ),
+            models.Index(
+                fields=['symbol', 'price_cents', 'created_at'],
+                name='ob_active_ask_idx',
+                condition=Q(side=-1, status__in=['ACTIVE', 'PARTIALLY_FILLED'], remaining_quantity__gt=0),
+            ),
         ]
     
+    # Fields touched by a fill, for bulk persistence from the matching engine
+    FILL_UPDATE_FIELDS = [
+        'remaining_quantity', 'traded_quantity', 'average_traded_price_cents',
+        'total_value_cents', 'status', 'is_active', 'updated_at',
+    ]
+    
+    # Fields touched when an order is closed as filled or cancelled
+    CLOSE_UPDATE_FIELDS = ['status', 'is_active', 'remaining_quantity', 'updated_at']
+    
+    # Decimal views of the cent fields, for callers and serializers
+    price = cents_property('price_cents', "Price per unit")
+    average_traded_price = cents_property('average_traded_price_cents', "Average price of traded quantity")
+    
     def __str__(self):
         return f"Order {self.order_id}: {self.get_side_display()} {self.remaining_quantity} @ {self.price}"
     
     def save(self, *args, **kwargs):
-        """Override save to add logging and validation."""
-        logger.info(f"Saving order {self.order_id} with status {self.status}")
+        """Override save to add debug logging and validation."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Saving order %s with status %s", self.order_id, self.status)
         super().save(*args, **kwargs)
     
     def mark_as_filled(self):
@@ -111,8 +155,9 @@ class Order(models.Model):
         self.is_active = False
         self.remaining_quantity = 0
         self.updated_at = timezone.now()
-        logger.info(f"Order {self.order_id} marked as filled")
-        self.save()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Order %s marked as filled", self.order_id)
+        self.save(update_fields=self.CLOSE_UPDATE_FIELDS)
     
     def mark_as_cancelled(self):
         """Mark order as cancelled."""
@@ -120,30 +165,35 @@ class Order(models.Model):
         self.is_active = False
         self.remaining_quantity = 0
         self.updated_at = timezone.now()
-        logger.info(f"Order {self.order_id} marked as cancelled")
-        self.save()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Order %s marked as cancelled", self.order_id)
+        self.save(update_fields=self.CLOSE_UPDATE_FIELDS)
     
-    def update_trade(self, trade_quantity, trade_price):
-        """Update order with new trade information."""
+    def apply_trade(self, trade_quantity, trade_price_cents):
+        """Apply a fill at a price in cents to the order fields without persisting them."""
         if trade_quantity > self.remaining_quantity:
             raise ValueError("Trade quantity exceeds remaining quantity")
         
-        # Update quantities
         self.remaining_quantity -= trade_quantity
         self.traded_quantity += trade_quantity
         
-        # Calculate new average price
-        if self.traded_quantity > 0:
-            total_value = (self.average_traded_price * (self.traded_quantity - trade_quantity) + 
-                          trade_price * trade_quantity)
-            self.average_traded_price = total_value / self.traded_quantity
+        # Integer VWAP from the exact running total, rounded half up to the cent
+        self.total_value_cents += trade_price_cents * trade_quantity
+        self.average_traded_price_cents = (
+            (2 * self.total_value_cents + self.traded_quantity) // (2 * self.traded_quantity)
+        )
         
-        # Update status
         if self.remaining_quantity == 0:
-            self.mark_as_filled()
-        elif self.traded_quantity > 0:
+            self.status = 'FILLED'
+            self.is_active = False
+        else:
             self.status = 'PARTIALLY_FILLED'
         
         self.updated_at = timezone.now()
-        logger.info(f"Order {self.order_id} updated with trade: {trade_quantity} @ {trade_price}")
-        self.save()
+    
+    def update_trade(self, trade_quantity, trade_price):
+        """Update order with new trade information and persist it in one UPDATE."""
+        self.apply_trade(trade_quantity, to_cents(trade_price))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Order %s updated with trade: %s @ %s", self.order_id, trade_quantity, trade_price)
+        self.save(update_fields=self.FILL_UPDATE_FIELDS)
@@ -0,0 +1,44 @@
+"""
+Integer-cent price helpers for the OrderAPI models.
+
+Prices are stored as whole cents; Decimal is only built at the API edges.
+"""
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Optional
+
+
+def to_cents(value) -> int:
+    """Convert a price (Decimal, str, int or float) to whole cents."""
+    if isinstance(value, int):
+        return value * 100
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    cents = value.scaleb(2)
+    # Prices validated to two places are already whole cents; only finer
+    # values pay for rounding
+    whole = int(cents)
+    if whole == cents:
+        return whole
+    return int(cents.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert whole cents back to a two-place Decimal."""
+    return Decimal(cents).scaleb(-2)
+
+
+def format_cents(cents: int) -> str:
+    """Render whole cents as a two-place string, as DRF renders a DecimalField."""
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def cents_property(attname: str, doc: str) -> property:
+    """Decimal view of an integer-cent field, settable with any price value."""
+    def fget(instance) -> Optional[Decimal]:
+        cents = getattr(instance, attname)
+        return None if cents is None else from_cents(cents)
+    
+    def fset(instance, value):
+        setattr(instance, attname, None if value is None else to_cents(value))
+    
+    return property(fget, fset, doc=doc)
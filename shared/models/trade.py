@@ -3,9 +3,11 @@ Trade model for the OrderAPI microservices system.
 """
 from django.db import models
 from django.utils import timezone
-import uuid
 import logging
 
+from .ids import uuid7
+from .prices import cents_property
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,16 +18,14 @@ class Trade(models.Model):
     # Primary key
     trade_id = models.UUIDField(
         primary_key=True, 
-        default=uuid.uuid4, 
+        default=uuid7, 
         editable=False,
         help_text="Unique identifier for the trade"
     )
     
     # Trade details
-    price = models.DecimalField(
-        max_digits=10, 
-        decimal_places=2, 
-        help_text="Execution price"
+    price_cents = models.PositiveBigIntegerField(
+        help_text="Execution price, in cents"
     )
     quantity = models.PositiveIntegerField(
         help_text="Quantity traded"
@@ -70,21 +70,27 @@ class Trade(models.Model):
             models.Index(fields=['bid_order']),
             models.Index(fields=['ask_order']),
             models.Index(fields=['is_settled']),
+            models.Index(fields=['created_at', 'trade_id']),
         ]
     
+    # Decimal view of price_cents, for callers and serializers
+    price = cents_property('price_cents', "Execution price")
+    
     def __str__(self):
         return f"Trade {self.trade_id}: {self.quantity} @ {self.price}"
     
     def save(self, *args, **kwargs):
-        """Override save to add logging."""
-        logger.info(f"Saving trade {self.trade_id}: {self.quantity} @ {self.price}")
+        """Override save to add debug logging."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Saving trade %s: %s @ %s", self.trade_id, self.quantity, self.price)
         super().save(*args, **kwargs)
     
     def mark_as_settled(self):
         """Mark trade as settled."""
         self.is_settled = True
         self.settlement_timestamp = timezone.now()
-        logger.info(f"Trade {self.trade_id} marked as settled")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Trade %s marked as settled", self.trade_id)
         self.save()
     
     def to_dict(self):
@@ -92,10 +98,10 @@ class Trade(models.Model):
         return {
             'trade_id': str(self.trade_id),
             'execution_timestamp': self.execution_timestamp.isoformat(),
-            'price': float(self.price),
+            'price': self.price_cents / 100,
             'quantity': self.quantity,
-            'bid_order_id': str(self.bid_order.order_id),
-            'ask_order_id': str(self.ask_order.order_id),
+            'bid_order_id': str(self.bid_order_id),
+            'ask_order_id': str(self.ask_order_id),
             'is_settled': self.is_settled,
             'settlement_timestamp': self.settlement_timestamp.isoformat() if self.settlement_timestamp else None
         }
@@ -3,9 +3,10 @@ User model for the OrderAPI microservices system.
 """
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-import uuid
 import logging
 
+from .ids import uuid7
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,7 +17,7 @@ class User(AbstractUser):
     # Primary key
     user_id = models.UUIDField(
         primary_key=True, 
-        default=uuid.uuid4, 
+        default=uuid7, 
         editable=False,
         help_text="Unique identifier for the user"
     )
@@ -69,7 +70,8 @@ class User(AbstractUser):
     
     def save(self, *args, **kwargs):
         """Override save to add logging."""
-        logger.info(f"Saving user {self.user_id}: {self.email}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Saving user %s: %s", self.user_id, self.email)
         super().save(*args, **kwargs)
     
     def can_place_order(self, order_value):
@@ -1,3 +1,10 @@
+"""
+Serializers shared by the OrderAPI services.
+
+Lists are rendered in one pass, with Serializer(queryset, many=True) or,
+on hot list endpoints, serialize_order_values / serialize_trade_values
+over .values() rows; never with one serializer instance per row.
+"""
 from .order_serializers import *
 from .trade_serializers import *
 from .user_serializers import *
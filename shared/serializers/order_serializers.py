@@ -3,7 +3,9 @@ Order serializers for OrderAPI microservices.
 """
 from rest_framework import serializers
 from decimal import Decimal
-from shared.models import Order
+from typing import Dict, Iterable, List
+from shared.models import Order, DEFAULT_SYMBOL
+from shared.models.prices import format_cents, from_cents, to_cents
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,91 +13,142 @@ logger = logging.getLogger(__name__)
 # Module-level constants for performance
 SIDE_MAP = {1: 'buy', -1: 'sell'}
 REVERSE_SIDE_MAP = {'buy': 1, 'sell': -1}
+MIN_PRICE = Decimal('0.01')
+MAX_PRICE = Decimal('999999.99')
+MAX_QUANTITY = 1000000
+
+# Columns OrderSerializer renders, for .only() on querysets feeding it
+ORDER_SERIALIZER_COLUMNS = (
+    'order_id', 'symbol', 'side', 'quantity', 'price_cents', 'remaining_quantity',
+    'traded_quantity', 'average_traded_price_cents', 'status', 'is_active',
+    'created_at', 'updated_at', 'user_id',
+)
+
+# Columns read by the .values() fast path for order lists
+ORDER_VALUE_FIELDS = (
+    'order_id', 'symbol', 'side', 'quantity', 'price_cents', 'remaining_quantity',
+    'traded_quantity', 'average_traded_price_cents', 'status', 'is_active',
+    'created_at', 'updated_at',
+)
+
+# Shared, stateless field used to render timestamps exactly as DRF does
+_TIMESTAMP_FIELD = serializers.DateTimeField()
+
+
+def serialize_order_values(rows: Iterable[Dict]) -> List[Dict]:
+    """
+    Render Order .values(*ORDER_VALUE_FIELDS) rows as OrderResponseSerializer output.
+    
+    Skips building serializer fields per row; side is rendered as 'buy'/'sell'.
+    """
+    timestamp = _TIMESTAMP_FIELD.to_representation
+    side_name = SIDE_MAP.get
+    return [{
+        'order_id': str(row['order_id']),
+        'symbol': row['symbol'],
+        'side': side_name(row['side'], 'unknown'),
+        'quantity': row['quantity'],
+        'price': format_cents(row['price_cents']),
+        'remaining_quantity': row['remaining_quantity'],
+        'traded_quantity': row['traded_quantity'],
+        'average_traded_price': format_cents(row['average_traded_price_cents']),
+        'status': row['status'],
+        'is_active': row['is_active'],
+        'created_at': timestamp(row['created_at']),
+        'updated_at': timestamp(row['updated_at']),
+    } for row in rows]
+
+
+class CentsField(serializers.DecimalField):
+    """
+    Decimal price on the wire, whole cents inside.
+    
+    Input is validated as a DecimalField, limits included, then converted
+    to cents once; use with a *_cents source.
+    """
+    
+    def run_validation(self, data=serializers.empty):
+        """Validate as a Decimal, then hand back whole cents."""
+        value = super().run_validation(data)
+        return None if value is None else to_cents(value)
+    
+    def to_representation(self, value):
+        """Render whole cents as the Decimal string."""
+        return super().to_representation(from_cents(value))
+
+
+class _OrderPriceField(CentsField):
+    """
+    Order limit price, checked once by DecimalField's own validators.
+    
+    Shared by the place and modify serializers so both enforce the same
+    precision and range.
+    """
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'price_cents')
+        super().__init__(
+            max_digits=10, decimal_places=2, min_value=MIN_PRICE, max_value=MAX_PRICE, **kwargs
+        )
+
+
+class _SideField(serializers.CharField):
+    """Integer order side rendered as 'buy'/'sell' with a single lookup."""
+    
+    def to_representation(self, value):
+        """Map the stored side to its name."""
+        return SIDE_MAP.get(value, 'unknown')
 
 
 class OrderSerializer(serializers.ModelSerializer):
     """Serializer for Order model with side conversion."""
     
-    side = serializers.SerializerMethodField()
+    side = _SideField(read_only=True)
+    # Decimal views of the integer-cent columns
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    average_traded_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
     class Meta:
         model = Order
-        fields = [
-            'order_id', 'side', 'quantity', 'price', 'remaining_quantity',
+        fields = (
+            'order_id', 'symbol', 'side', 'quantity', 'price', 'remaining_quantity',
             'traded_quantity', 'average_traded_price', 'status', 'is_active',
-            'created_at', 'updated_at', 'user_id'
-        ]
-        read_only_fields = [
+            'created_at', 'updated_at', 'user_id',
+        )
+        read_only_fields = (
             'order_id', 'remaining_quantity', 'traded_quantity',
-            'average_traded_price', 'status', 'is_active', 'created_at', 'updated_at'
-        ]
-    
-    def get_side(self, obj):
-        """Convert integer side to string for API response."""
-        return SIDE_MAP.get(obj.side, 'unknown')
-    
-    def to_representation(self, instance):
-        """Convert side values in response."""
-        data = super().to_representation(instance)
-        data['side'] = SIDE_MAP.get(instance.side, 'unknown')
-        return data
+            'average_traded_price', 'status', 'is_active', 'created_at', 'updated_at',
+        )
 
 
 class PlaceOrderSerializer(serializers.Serializer):
     """Serializer for placing new orders."""
     
     side = serializers.ChoiceField(choices=['buy', 'sell'])
-    quantity = serializers.IntegerField(min_value=1)
-    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0.01)
+    quantity = serializers.IntegerField(min_value=1, max_value=MAX_QUANTITY)
+    # decimal_places=2 already rejects sub-cent prices
+    price = _OrderPriceField()
+    symbol = serializers.CharField(max_length=20, required=False, default=DEFAULT_SYMBOL)
     
     def validate_side(self, value):
         """Validate and convert side to integer."""
         if value not in REVERSE_SIDE_MAP:
             raise serializers.ValidationError("Side must be 'buy' or 'sell'")
         return REVERSE_SIDE_MAP[value]
-    
-    def validate_price(self, value):
-        """Validate price format and value."""
-        if value <= 0:
-            raise serializers.ValidationError("Price must be positive")
-        
-        # Check if price is multiple of 0.01
-        if value % Decimal('0.01') != 0:
-            raise serializers.ValidationError("Price must be multiple of 0.01")
-        
-        return value
-    
-    def validate_quantity(self, value):
-        """Validate quantity."""
-        if value <= 0:
-            raise serializers.ValidationError("Quantity must be positive")
-        if value > 1000000:
-            raise serializers.ValidationError("Quantity exceeds maximum allowed")
-        return value
 
 
 class ModifyOrderSerializer(serializers.Serializer):
     """Serializer for modifying existing orders."""
     
     order_id = serializers.UUIDField()
-    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0.01)
-    
-    def validate_price(self, value):
-        """Validate price format and value."""
-        if value <= 0:
-            raise serializers.ValidationError("Price must be positive")
-        
-        # Check if price is multiple of 0.01
-        if value % Decimal('0.01') != 0:
-            raise serializers.ValidationError("Price must be multiple of 0.01")
-        
-        return value
+    price = _OrderPriceField()
 
 
 class OrderResponseSerializer(serializers.Serializer):
     """Serializer for order API responses."""
     
     order_id = serializers.UUIDField()
+    symbol = serializers.CharField()
     side = serializers.CharField()
     quantity = serializers.IntegerField()
     price = serializers.DecimalField(max_digits=10, decimal_places=2)
@@ -2,24 +2,60 @@
 Trade serializers for OrderAPI microservices.
 """
 from rest_framework import serializers
+from typing import Dict, Iterable, List
 from shared.models import Trade
+from shared.models.prices import format_cents
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns read by the .values() fast path for trade lists; created_at is
+# there for keyset pagination, not rendered
+TRADE_VALUE_FIELDS = (
+    'trade_id', 'price_cents', 'quantity', 'bid_order_id', 'ask_order_id',
+    'execution_timestamp', 'is_settled', 'settlement_timestamp', 'created_at',
+)
+
+# Shared, stateless field used to render timestamps exactly as DRF does
+_TIMESTAMP_FIELD = serializers.DateTimeField()
+
+
+def serialize_trade_values(rows: Iterable[Dict]) -> List[Dict]:
+    """Render Trade .values(*TRADE_VALUE_FIELDS) rows as TradeSerializer output, without per-row fields."""
+    timestamp = _TIMESTAMP_FIELD.to_representation
+    return [{
+        'trade_id': str(row['trade_id']),
+        'price': format_cents(row['price_cents']),
+        'quantity': row['quantity'],
+        'bid_order': row['bid_order_id'],
+        'ask_order': row['ask_order_id'],
+        'execution_timestamp': timestamp(row['execution_timestamp']),
+        'is_settled': row['is_settled'],
+        'settlement_timestamp': timestamp(row['settlement_timestamp']) if row['settlement_timestamp'] else None,
+    } for row in rows]
+
 
 class TradeSerializer(serializers.ModelSerializer):
-    """Serializer for Trade model."""
+    """
+    Serializer for Trade model.
+    
+    bid_order and ask_order render as primary keys read from the trade's
+    own foreign key columns, so serializing never queries the orders
+    table, whichever way the trades were fetched.
+    """
+    
+    # Decimal view of the integer-cent column
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
     
     class Meta:
         model = Trade
-        fields = [
+        fields = (
             'trade_id', 'price', 'quantity', 'bid_order', 'ask_order',
-            'execution_timestamp', 'is_settled', 'settlement_timestamp'
-        ]
-        read_only_fields = [
-            'trade_id', 'execution_timestamp', 'is_settled', 'settlement_timestamp'
-        ]
+            'execution_timestamp', 'is_settled', 'settlement_timestamp',
+        )
+        read_only_fields = (
+            'trade_id', 'execution_timestamp', 'is_settled', 'settlement_timestamp',
+        )
 
 
 class TradeResponseSerializer(serializers.Serializer):
@@ -35,6 +71,16 @@ class TradeResponseSerializer(serializers.Serializer):
     settlement_timestamp = serializers.DateTimeField(allow_null=True)
 
 
+class TradeSettlementBatchSerializer(serializers.Serializer):
+    """Serializer for batch settlement requests."""
+    
+    trade_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=1000
+    )
+
+
 class TradeListResponseSerializer(serializers.Serializer):
     """Serializer for trade list API responses."""
     
@@ -1,6 +1,8 @@
 """
 User serializers for OrderAPI microservices.
 """
+from secrets import compare_digest
+
 from rest_framework import serializers
 from shared.models import User
 import logging
@@ -13,14 +15,14 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
-        fields = [
+        fields = (
             'user_id', 'username', 'email', 'first_name', 'last_name',
             'is_active', 'trading_enabled', 'max_order_value',
-            'created_at', 'updated_at'
-        ]
-        read_only_fields = [
-            'user_id', 'created_at', 'updated_at'
-        ]
+            'created_at', 'updated_at',
+        )
+        read_only_fields = (
+            'user_id', 'created_at', 'updated_at',
+        )
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -31,22 +33,22 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
-        fields = [
+        fields = (
             'username', 'email', 'password', 'password_confirm',
-            'first_name', 'last_name'
-        ]
+            'first_name', 'last_name',
+        )
     
     def validate(self, attrs):
         """Validate password confirmation."""
-        if attrs['password'] != attrs['password_confirm']:
+        password_confirm = attrs.pop('password_confirm')
+        if not compare_digest(attrs['password'].encode(), password_confirm.encode()):
             raise serializers.ValidationError("Passwords don't match")
         return attrs
     
     def create(self, validated_data):
         """Create new user."""
-        validated_data.pop('password_confirm')
         user = User.objects.create_user(**validated_data)
-        logger.info(f"New user created: {user.user_id}")
+        logger.info("New user created: %s", user.user_id)
         return user
 
 
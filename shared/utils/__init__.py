@@ -1,4 +1,5 @@
 from .redis_client import get_redis_client
+from . import order_book_cache
 from .validators import validate_order_data, validate_price, validate_quantity
 
-__all__ = ['get_redis_client', 'validate_order_data', 'validate_price', 'validate_quantity']
+__all__ = ['get_redis_client', 'order_book_cache', 'validate_order_data', 'validate_price', 'validate_quantity']
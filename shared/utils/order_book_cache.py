@@ -0,0 +1,122 @@
+"""
+Redis mirror of resting orders for fast order book snapshots.
+
+The order management service writes it from each book's fanout task; the
+trade service reads it instead of querying the orders table. Per symbol:
+two sorted sets of order ids scored by price, a hash of rendered order
+entries, and a ready marker set once the book has been fully mirrored.
+Rendered snapshot responses are also cached here briefly so that polling
+clients share one computation, and depth updates are pushed to a Channels
+group per symbol.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def side_key(symbol: str, side: int) -> str:
+    """Sorted set of resting order ids for one side, scored by price."""
+    return f"orderbook:{symbol}:{'buy' if side == 1 else 'sell'}"
+
+
+def orders_key(symbol: str) -> str:
+    """Hash of order id -> rendered order entry."""
+    return f"orderbook:{symbol}:orders"
+
+
+def ready_key(symbol: str) -> str:
+    """Set once the mirror holds the whole book."""
+    return f"orderbook:{symbol}:ready"
+
+
+def response_key(symbol: str, depth: int) -> str:
+    """Rendered /orderbook/ response shared by every reader for a short TTL."""
+    return f"orderbook:snap:{symbol}:{depth}"
+
+
+def update_group(symbol: str) -> str:
+    """Channels group that receives pushed depth updates for symbol."""
+    from django.conf import settings
+    return f"{settings.CHANNEL_GROUPS['order_book']}.{symbol}"
+
+
+def order_entry(order) -> Dict:
+    """Render a resting order the way order book snapshots return it."""
+    return {
+        'order_id': str(order.order_id),
+        'side': order.side,
+        'price': order.price_cents / 100,
+        'quantity': order.remaining_quantity,
+        'total_quantity': order.quantity,
+        'traded_quantity': order.traded_quantity,
+        'status': order.status,
+        'created_at': order.created_at.isoformat(),
+        'user_id': str(order.user_id) if order.user_id else None
+    }
+
+
+def queue_book_changes(pipe, symbol: str, upserts: Iterable[Dict],
+                       removes: Iterable[Tuple[str, int]], reset: bool = False):
+    """
+    Queue resting-order changes to the mirror on pipe.
+
+    upserts are order entries still resting; removes are (order_id, side)
+    pairs that left the book. reset replaces the whole mirror. The caller
+    executes pipe, so the changes can share a round-trip with its own
+    commands.
+    """
+    buy_key, sell_key, entries_key = side_key(symbol, 1), side_key(symbol, -1), orders_key(symbol)
+
+    if reset:
+        pipe.delete(buy_key, sell_key, entries_key)
+
+    for order_id, side in removes:
+        pipe.zrem(buy_key if side == 1 else sell_key, order_id)
+        pipe.hdel(entries_key, order_id)
+
+    for entry in upserts:
+        pipe.zadd(buy_key if entry['side'] == 1 else sell_key, {entry['order_id']: entry['price']})
+        pipe.hset(entries_key, entry['order_id'], orjson.dumps(entry))
+
+    if reset:
+        pipe.set(ready_key(symbol), 1)
+
+
+def read_book(redis_client, symbol: str, depth: int) -> Optional[Tuple[List[Dict], List[Dict]]]:
+    """
+    Top depth orders per side in price-time priority.
+
+    Returns None when the mirror is not ready, so callers can fall back to
+    the database.
+    """
+    buy_key, sell_key = side_key(symbol, 1), side_key(symbol, -1)
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.exists(ready_key(symbol))
+    pipe.zrevrange(buy_key, depth - 1, depth - 1, withscores=True)
+    pipe.zrange(sell_key, depth - 1, depth - 1, withscores=True)
+    ready, buy_edge, sell_edge = pipe.execute()
+    if not ready:
+        return None
+
+    # Everything priced at or better than the depth-th order, so that orders
+    # tied on price at the edge can be cut by time priority below
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zrevrangebyscore(buy_key, '+inf', buy_edge[0][1] if buy_edge else '-inf')
+    pipe.zrangebyscore(sell_key, '-inf', sell_edge[0][1] if sell_edge else '+inf')
+    buy_ids, sell_ids = pipe.execute()
+
+    entries = {}
+    if buy_ids or sell_ids:
+        ids = buy_ids + sell_ids
+        entries = dict(zip(ids, redis_client.hmget(orders_key(symbol), ids)))
+
+    buy_orders = [orjson.loads(entries[order_id]) for order_id in buy_ids if entries.get(order_id)]
+    sell_orders = [orjson.loads(entries[order_id]) for order_id in sell_ids if entries.get(order_id)]
+    buy_orders.sort(key=lambda entry: (-entry['price'], entry['created_at']))
+    sell_orders.sort(key=lambda entry: (entry['price'], entry['created_at']))
+
+    return buy_orders[:depth], sell_orders[:depth]
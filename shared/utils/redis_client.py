@@ -2,9 +2,11 @@
 Redis client utilities for OrderAPI microservices.
 """
 import redis
-import json
+import orjson
 import logging
-from typing import Optional, Any
+import threading
+from redis.utils import HIREDIS_AVAILABLE
+from typing import Optional, Any, Dict, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -14,18 +16,23 @@ class RedisClient:
     Redis client wrapper with connection pooling and error handling.
     """
     
-    def __init__(self, host='localhost', port=6379, db=0, password=None):
+    def __init__(self, host='localhost', port=6379, db=0, password=None, max_connections=50):
         self.host = host
         self.port = port
         self.db = db
         self.password = password
+        self.max_connections = max_connections
         self._client = None
         self._connect()
     
     def _connect(self):
         """Establish Redis connection."""
         try:
-            self._client = redis.Redis(
+            # redis-py parses replies with hiredis when it is installed, and
+            # the pool drops inherited connections itself after a fork. At
+            # max_connections callers wait for a free connection instead of
+            # failing
+            pool = redis.BlockingConnectionPool(
                 host=self.host,
                 port=self.port,
                 db=self.db,
@@ -33,15 +40,28 @@ class RedisClient:
                 decode_responses=True,
                 socket_connect_timeout=5,
                 socket_timeout=5,
-                retry_on_timeout=True
+                socket_keepalive=True,
+                retry_on_timeout=True,
+                max_connections=self.max_connections,
+                timeout=5
             )
+            self._client = redis.Redis(connection_pool=pool)
             # Test connection
             self._client.ping()
             logger.info(f"Connected to Redis at {self.host}:{self.port}")
+            if not HIREDIS_AVAILABLE:
+                logger.warning("hiredis is not installed; Redis replies are parsed in pure Python")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
     
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        """Encode dict and list payloads as JSON; other values go to Redis as-is."""
+        if isinstance(value, (dict, list)):
+            return orjson.dumps(value)
+        return value
+    
     def get(self, key: str) -> Optional[str]:
         """Get value from Redis."""
         try:
@@ -53,9 +73,7 @@ class RedisClient:
     def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
         """Set value in Redis."""
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            return self._client.set(key, value, ex=ex)
+            return self._client.set(key, self._encode(value), ex=ex)
         except Exception as e:
             logger.error(f"Redis SET error for key {key}: {e}")
             return False
@@ -71,13 +89,50 @@ class RedisClient:
     def publish(self, channel: str, message: Any) -> bool:
         """Publish message to Redis channel."""
         try:
-            if isinstance(message, (dict, list)):
-                message = json.dumps(message)
-            return bool(self._client.publish(channel, message))
+            return bool(self._client.publish(channel, self._encode(message)))
         except Exception as e:
             logger.error(f"Redis PUBLISH error for channel {channel}: {e}")
             return False
     
+    def mset(self, mapping: Dict[str, Any], ex: Optional[int] = None) -> bool:
+        """Set several keys in one round-trip."""
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, self._encode(value), ex=ex)
+            return all(pipe.execute())
+        except Exception as e:
+            logger.error(f"Redis MSET error for {len(mapping)} keys: {e}")
+            return False
+    
+    def publish_many(self, channel: str, messages: Iterable[Any]) -> int:
+        """
+        Publish several messages to a channel in one round-trip.
+        
+        Callers producing a burst of events should collect them and flush
+        once rather than publishing each. Returns how many were published.
+        """
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for message in messages:
+                pipe.publish(channel, self._encode(message))
+            return len(pipe.execute())
+        except Exception as e:
+            logger.error(f"Redis PUBLISH error for channel {channel}: {e}")
+            return 0
+    
+    def hmget(self, key: str, fields: list) -> list:
+        """Get several hash fields in one call."""
+        try:
+            return self._client.hmget(key, fields)
+        except Exception as e:
+            logger.error(f"Redis HMGET error for key {key}: {e}")
+            return [None] * len(fields)
+    
+    def pipeline(self, transaction: bool = True):
+        """Return a raw pipeline for batching commands into one round-trip."""
+        return self._client.pipeline(transaction=transaction)
+    
     def subscribe(self, channels: list):
         """Subscribe to Redis channels."""
         try:
@@ -91,11 +146,28 @@ class RedisClient:
 
 # Global Redis client instance
 _redis_client = None
+_redis_client_lock = threading.Lock()
 
 
 def get_redis_client() -> RedisClient:
-    """Get global Redis client instance."""
+    """
+    Get global Redis client instance.
+    
+    Once created it is returned without locking; the lock only keeps
+    threads racing on first use from building separate pools.
+    """
     global _redis_client
-    if _redis_client is None:
-        _redis_client = RedisClient()
-    return _redis_client
+    client = _redis_client
+    if client is None:
+        with _redis_client_lock:
+            client = _redis_client
+            if client is None:
+                from django.conf import settings
+                client = _redis_client = RedisClient(
+                    host=getattr(settings, 'REDIS_HOST', 'localhost'),
+                    port=getattr(settings, 'REDIS_PORT', 6379),
+                    db=getattr(settings, 'REDIS_DB', 0),
+                    password=getattr(settings, 'REDIS_PASSWORD', None),
+                    max_connections=getattr(settings, 'REDIS_MAX_CONNECTIONS', 50)
+                )
+    return client
@@ -0,0 +1,44 @@
+"""
+Response renderers for OrderAPI microservices.
+"""
+from decimal import Decimal
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+
+
+def _default(obj):
+    """Encode the types orjson leaves to the caller the way DRF's encoder does."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__') and not isinstance(obj, (bytes, bytearray)):
+        return tuple(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class OrjsonRenderer(BaseRenderer):
+    """
+    JSON renderer backed by orjson.
+    
+    UUIDs, datetimes and dict/list/str subclasses such as ReturnDict and
+    ErrorDetail are encoded natively; Decimals fall back to floats as with
+    DRF's JSONRenderer.
+    """
+    
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data into JSON bytes."""
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_default, option=_OPTIONS)
@@ -6,40 +6,25 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Order limits
+_MAX_PRICE_CENTS = 99999999
+_MAX_QUANTITY = 1000000
 
-def validate_price(price: float) -> bool:
+
+def validate_price(price_cents: int) -> bool:
     """
-    Validate price according to business rules.
+    Validate a price in whole cents according to business rules.
+    
+    Prices are parsed into cents once, by the serializers, so this is an
+    integer range check.
     
     Args:
-        price (float): Price to validate
+        price_cents (int): Price to validate, in cents
     
     Returns:
         bool: True if valid, False otherwise
     """
-    try:
-        price_decimal = Decimal(str(price))
-        
-        # Check if price is positive
-        if price_decimal <= 0:
-            logger.warning(f"Invalid price: {price} - must be positive")
-            return False
-        
-        # Check if price is multiple of 0.01
-        if price_decimal % Decimal('0.01') != 0:
-            logger.warning(f"Invalid price: {price} - must be multiple of 0.01")
-            return False
-        
-        # Check if price is within reasonable range
-        if price_decimal > Decimal('999999.99'):
-            logger.warning(f"Invalid price: {price} - exceeds maximum value")
-            return False
-        
-        return True
-        
-    except (ValueError, TypeError) as e:
-        logger.error(f"Price validation error: {e}")
-        return False
+    return isinstance(price_cents, int) and 0 < price_cents <= _MAX_PRICE_CENTS
 
 
 def validate_quantity(quantity: int) -> bool:
@@ -55,12 +40,12 @@ def validate_quantity(quantity: int) -> bool:
     try:
         # Check if quantity is positive integer
         if not isinstance(quantity, int) or quantity <= 0:
-            logger.warning(f"Invalid quantity: {quantity} - must be positive integer")
+            logger.warning("Invalid quantity: %s - must be positive integer", quantity)
             return False
         
         # Check if quantity is within reasonable range
-        if quantity > 1000000:
-            logger.warning(f"Invalid quantity: {quantity} - exceeds maximum value")
+        if quantity > _MAX_QUANTITY:
+            logger.warning("Invalid quantity: %s - exceeds maximum value", quantity)
             return False
         
         return True
@@ -81,7 +66,7 @@ def validate_side(side: int) -> bool:
         bool: True if valid, False otherwise
     """
     if side not in [1, -1]:
-        logger.warning(f"Invalid side: {side} - must be 1 (buy) or -1 (sell)")
+        logger.warning("Invalid side: %s - must be 1 (buy) or -1 (sell)", side)
         return False
     return True
 
@@ -90,6 +75,9 @@ def validate_order_data(data: dict) -> tuple[bool, str]:
     """
     Validate complete order data.
     
+    The side and quantity rules are checked inline rather than through
+    validate_side and validate_quantity, as this runs on every order.
+    
     Args:
         data (dict): Order data to validate
     
@@ -97,22 +85,24 @@ def validate_order_data(data: dict) -> tuple[bool, str]:
         tuple: (is_valid, error_message)
     """
     try:
-        # Check required fields
-        required_fields = ['side', 'quantity', 'price']
-        for field in required_fields:
-            if field not in data:
-                return False, f"Missing required field: {field}"
+        # Check required fields, in the order they are reported
+        try:
+            side = data['side']
+            quantity = data['quantity']
+            price_cents = data['price_cents']
+        except KeyError as e:
+            return False, f"Missing required field: {e.args[0]}"
         
         # Validate side
-        if not validate_side(data['side']):
+        if side != 1 and side != -1:
             return False, "Invalid side: must be 1 (buy) or -1 (sell)"
         
         # Validate quantity
-        if not validate_quantity(data['quantity']):
+        if not isinstance(quantity, int) or not 0 < quantity <= _MAX_QUANTITY:
             return False, "Invalid quantity: must be positive integer"
         
         # Validate price
-        if not validate_price(data['price']):
+        if not validate_price(price_cents):
             return False, "Invalid price: must be positive and multiple of 0.01"
         
         return True, ""
@@ -122,14 +112,14 @@ def validate_order_data(data: dict) -> tuple[bool, str]:
         return False, f"Validation error: {str(e)}"
 
 
-def normalize_price(price: float) -> Decimal:
+def normalize_price(price: float) -> int:
     """
-    Normalize price to 2 decimal places.
+    Normalize price to whole cents, dropping fractions of a cent.
     
     Args:
         price (float): Price to normalize
     
     Returns:
-        Decimal: Normalized price
+        int: Normalized price, in cents
     """
-    return Decimal(str(price)).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+    return int(Decimal(str(price)).scaleb(2).to_integral_value(rounding=ROUND_DOWN))